@@ -0,0 +1,100 @@
+"""
+Hit Matrix Module
+
+Contains the compact pattern-by-page record of where a preview found hits.
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+def format_page_ranges(pages: Iterable[int]) -> str:
+    """Format sorted page numbers as ranges, e.g. [1, 2, 3, 7] as "1-3, 7"."""
+    return ", ".join(
+        str(first) if first == last else f"{first}-{last}"
+        for first, last in _runs(pages)
+    )
+
+
+def _runs(pages: Iterable[int]) -> Iterator[Tuple[int, int]]:
+    """Group sorted page numbers into runs of consecutive pages."""
+    first = last = None
+    for page in pages:
+        if last is not None and page == last + 1:
+            last = page
+            continue
+        if first is not None:
+            yield first, last
+        first = last = page
+    
+    if first is not None:
+        yield first, last
+
+
+class HitMatrix:
+    """
+    Bit-packed matrix of the pages each pattern has hits on, with hit counts.
+    
+    Each pattern's row holds one bit per page, so a 100,000-page document
+    costs 12.5 KB per pattern however broad the pattern is. Page lists and
+    ranges are only expanded from the bits when asked for. Pages are
+    numbered from 1 in everything the matrix returns, and passing no
+    pattern asks about all patterns together.
+    """
+    
+    def __init__(self, patterns: List[str], page_count: int):
+        # One row per distinct pattern
+        self._index: Dict[str, int] = {}
+        for pattern in patterns:
+            self._index.setdefault(pattern, len(self._index))
+        self.patterns = list(self._index)
+        self.page_count = page_count
+        
+        self._rows = [bytearray((page_count + 7) // 8) for _ in self.patterns]
+        self._counts = array("q", [0] * len(self.patterns))
+    
+    def add(self, pattern: str, page_num: int, hits: int = 1) -> None:
+        """Record hits of a pattern on a 0-based page."""
+        index = self._index[pattern]
+        self._rows[index][page_num >> 3] |= 1 << (page_num & 7)
+        self._counts[index] += hits
+    
+    def count(self, pattern: str) -> int:
+        """Number of hits of a pattern."""
+        return self._counts[self._index[pattern]]
+    
+    @property
+    def total_instances(self) -> int:
+        """Number of hits of all patterns together."""
+        return sum(self._counts)
+    
+    def _row(self, pattern: Optional[str]) -> bytes:
+        """A pattern's row, or the union of all rows."""
+        if pattern is not None:
+            return bytes(self._rows[self._index[pattern]])
+        
+        union = 0
+        for row in self._rows:
+            union |= int.from_bytes(row, "little")
+        return union.to_bytes((self.page_count + 7) // 8, "little")
+    
+    def pages_hit(self, pattern: Optional[str] = None) -> int:
+        """Number of pages a pattern, or any pattern, has hits on."""
+        return int.from_bytes(self._row(pattern), "little").bit_count()
+    
+    def iter_pages(self, pattern: Optional[str] = None) -> Iterator[int]:
+        """Pages a pattern, or any pattern, has hits on, in order."""
+        for byte_num, byte in enumerate(self._row(pattern)):
+            if not byte:
+                continue
+            for bit in range(8):
+                if byte & (1 << bit):
+                    yield (byte_num << 3) + bit + 1
+    
+    def pages(self, pattern: Optional[str] = None) -> List[int]:
+        """List the pages a pattern, or any pattern, has hits on."""
+        return list(self.iter_pages(pattern))
+    
+    def page_ranges(self, pattern: Optional[str] = None) -> str:
+        """The pages a pattern, or any pattern, has hits on, as ranges."""
+        return format_page_ranges(self.iter_pages(pattern))
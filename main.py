@@ -7,11 +7,15 @@ Supports regex patterns, case-insensitive matching, and configurable options.
 """
 
 import argparse
+import json
 import logging
 import sys
 from pathlib import Path
 
+from hit_matrix import format_page_ranges
+from pattern_stats import PatternStats, default_stats_path
 from pdf_redactor import PDFRedactor, RedactionError
+from text_index import default_index_path
 
 
 def setup_logging(verbose: bool = False) -> None:
@@ -38,8 +42,8 @@ Examples:
         """
     )
     
-    parser.add_argument("input_file", type=Path, help="Input PDF file")
-    parser.add_argument("patterns", nargs="+", help="Text patterns to redact")
+    parser.add_argument("input_file", type=Path, nargs="?", help="Input PDF file")
+    parser.add_argument("patterns", nargs="*", help="Text patterns to redact")
     
     parser.add_argument(
         "-o", "--output",
@@ -56,7 +60,7 @@ Examples:
     parser.add_argument(
         "--case-insensitive",
         action="store_true",
-        help="Perform case-insensitive matching"
+        help="Perform case-insensitive regex matching (literals always ignore case)"
     )
     
     parser.add_argument(
@@ -65,6 +69,116 @@ Examples:
         help="Match whole words only"
     )
     
+    parser.add_argument(
+        "--pages",
+        metavar="RANGES",
+        help="Only scan these pages, e.g. '1-3,200-end'; other pages are left untouched"
+    )
+    
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Scan the pages in N processes, each taking chunks of consecutive pages (default: 1)"
+    )
+    
+    parser.add_argument(
+        "--join-blocks",
+        action="store_true",
+        help="Match across line breaks within a text block"
+    )
+    
+    parser.add_argument(
+        "--ignore-accents",
+        action="store_true",
+        help="Match regardless of accents and ligatures, e.g. 'Jose' also finds 'José'"
+    )
+    
+    parser.add_argument(
+        "--digit-projection",
+        action="store_true",
+        help="Match numeric regexes by their digits alone, whatever separates them"
+    )
+    
+    parser.add_argument(
+        "--max-edits",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Also match literals with up to N wrong, missing or extra characters (e.g. OCR errors)"
+    )
+    
+    parser.add_argument(
+        "--text-index",
+        action="store_true",
+        help="Keep an index of the extracted text next to the input file and reuse it on later runs"
+    )
+    
+    parser.add_argument(
+        "--triage",
+        action="store_true",
+        help="Only check whether the document contains any match, stopping at the first one"
+    )
+    
+    parser.add_argument(
+        "--hits-per-pattern",
+        type=int,
+        metavar="K",
+        help="With --triage, keep scanning until every pattern has K hits"
+    )
+    
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Stream every match to stdout as JSON Lines as it is found, without making changes"
+    )
+    
+    parser.add_argument(
+        "--sample",
+        type=int,
+        metavar="N",
+        help="Dry run on a random sample of N pages, estimating hits with confidence intervals"
+    )
+    
+    parser.add_argument(
+        "--sample-fraction",
+        type=float,
+        metavar="F",
+        help="Like --sample, sampling this share (0-1] of the pages"
+    )
+    
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Seed of the page sample, so sampled runs are reproducible (default: 0)"
+    )
+    
+    parser.add_argument(
+        "--escalate",
+        action="store_true",
+        help="With --sample, follow the estimate with a full dry run, whatever the sample found"
+    )
+    
+    parser.add_argument(
+        "--pattern-stats",
+        action="store_true",
+        help="Record each pattern's hit rate and cost across runs, and try the cheapest way to a hit first"
+    )
+    
+    parser.add_argument(
+        "--show-pattern-stats",
+        action="store_true",
+        help="Show the recorded pattern statistics and exit"
+    )
+    
+    parser.add_argument(
+        "--reset-pattern-stats",
+        action="store_true",
+        help="Forget the recorded pattern statistics and exit"
+    )
+    
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -83,7 +197,36 @@ Examples:
         help="Disable progress bars"
     )
     
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not (args.show_pattern_stats or args.reset_pattern_stats) and not args.patterns:
+        parser.error("the following arguments are required: input_file, patterns")
+    if args.max_edits < 0:
+        parser.error("--max-edits must not be negative")
+    if args.sample is not None and args.sample < 1:
+        parser.error("--sample must be at least 1")
+    if args.hits_per_pattern is not None and args.hits_per_pattern < 1:
+        parser.error("--hits-per-pattern must be at least 1")
+    if args.sample_fraction is not None and not 0 < args.sample_fraction <= 1:
+        parser.error("--sample-fraction must be greater than 0 and at most 1")
+    
+    return args
+
+
+def show_pattern_stats(stats: PatternStats) -> None:
+    """Log the recorded statistics of every pattern."""
+    logger = logging.getLogger(__name__)
+    if not stats.records:
+        logger.info(f"No pattern statistics recorded in {stats.path}")
+        return
+    
+    logger.info(f"Pattern statistics: {stats.path}")
+    for kind, records in sorted(stats.records.items()):
+        for pattern, record in records.items():
+            timing = f", {record.seconds_per_page * 1000:.3f} ms/page" if record.seconds else ""
+            logger.info(
+                f"  [{kind}] '{pattern}': hit on {record.pages_hit}/{record.pages} pages "
+                f"({record.hit_rate:.0%}), {record.hits} hits{timing}"
+            )
 
 
 def main() -> int:
@@ -92,14 +235,109 @@ def main() -> int:
     setup_logging(args.verbose)
     logger = logging.getLogger(__name__)
     
+    if args.show_pattern_stats or args.reset_pattern_stats:
+        stats = PatternStats.load(default_stats_path())
+        if args.show_pattern_stats:
+            show_pattern_stats(stats)
+        if args.reset_pattern_stats:
+            stats.reset()
+            logger.info(f"Pattern statistics reset: {stats.path}")
+        return 0
+    
     try:
-        redactor = PDFRedactor(args.input_file, args.output, show_progress=not args.no_progress)
+        redactor = PDFRedactor(
+            args.input_file,
+            args.output,
+            show_progress=not args.no_progress,
+            pages=args.pages,
+            workers=args.workers,
+            join_blocks=args.join_blocks,
+            ignore_accents=args.ignore_accents,
+            digit_projection=args.digit_projection,
+            max_edits=args.max_edits,
+            text_index=default_index_path(args.input_file) if args.text_index else None,
+            pattern_stats=default_stats_path() if args.pattern_stats else None
+        )
         
         logger.info(f"Processing: {args.input_file}")
         logger.info(f"Patterns to redact: {args.patterns}")
         logger.info(f"Output will be: {redactor.output_file}")
         
-        if args.dry_run:
+        if args.triage:
+            logger.info("TRIAGE MODE - No changes will be made")
+            result = redactor.triage(
+                args.patterns,
+                case_sensitive=not args.case_insensitive,
+                use_regex=args.regex,
+                whole_words_only=args.whole_words,
+                hits_per_pattern=args.hits_per_pattern
+            )
+            
+            if result["contains_matches"]:
+                first_hit = result["first_hit"]
+                logger.info(f"Match found: pattern '{first_hit['pattern']}' on page {first_hit['page']}")
+                if args.hits_per_pattern:
+                    for pattern, info in result["patterns"].items():
+                        logger.info(
+                            f"  Pattern '{pattern}': {info['count']} hit(s) on pages {format_page_ranges(info['pages'])}"
+                        )
+            else:
+                logger.info("No matches found")
+            
+            logger.info(f"Pages scanned: {result['pages_scanned']} of {result['pages_total']}")
+            return 0
+        
+        if args.jsonl:
+            logger.info("STREAMING MATCHES - No changes will be made")
+            streamed = 0
+            for record in redactor.iter_matches(
+                args.patterns,
+                case_sensitive=not args.case_insensitive,
+                use_regex=args.regex,
+                whole_words_only=args.whole_words
+            ):
+                print(json.dumps(record.to_dict(), ensure_ascii=False), flush=True)
+                streamed += 1
+            
+            logger.info(f"Matches streamed: {streamed}")
+            return 0
+        
+        dry_run = args.dry_run
+        if args.sample is not None or args.sample_fraction is not None:
+            logger.info("SAMPLED DRY RUN - No changes will be made")
+            estimate = redactor.estimate_redactions(
+                args.patterns,
+                case_sensitive=not args.case_insensitive,
+                use_regex=args.regex,
+                whole_words_only=args.whole_words,
+                sample_size=args.sample,
+                sample_fraction=args.sample_fraction,
+                seed=args.seed
+            )
+            
+            confidence = f"{estimate['confidence']:.0%} CI"
+            logger.info(
+                f"Sampled {estimate['pages_sampled']} of {estimate['pages_total']} pages (seed {estimate['seed']}):"
+            )
+            for pattern, info in estimate["patterns"].items():
+                count_low, count_high = info["count_interval"]
+                fraction_low, fraction_high = info["page_fraction_interval"]
+                logger.info(
+                    f"  Pattern '{pattern}': ~{info['estimated_count']:.0f} instances "
+                    f"({confidence} {count_low:.0f}-{count_high:.0f}) on ~{info['page_fraction']:.1%} of pages "
+                    f"({confidence} {fraction_low:.1%}-{fraction_high:.1%})"
+                )
+            
+            if not args.escalate:
+                logger.info("Run with --dry-run instead of --sample for exact counts")
+                return 0
+            
+            # A sample without hits does not show the document has none, so
+            # the full dry run follows either way
+            logger.info("Escalating to a full dry run")
+            dry_run = True
+        
+        if dry_run:
             logger.info("DRY RUN MODE - No changes will be made")
             preview = redactor.preview_redactions(
                 args.patterns,
@@ -110,10 +348,10 @@ def main() -> int:
             
             logger.info("Preview Results:")
             for pattern, info in preview["patterns"].items():
-                logger.info(f"  Pattern '{pattern}': {info['count']} instances on pages {info['pages']}")
+                logger.info(f"  Pattern '{pattern}': {info['count']} instances on pages {info['page_ranges'] or 'none'}")
             
             logger.info(f"Total instances that would be redacted: {preview['total_instances']}")
-            logger.info(f"Pages that would be affected: {preview['pages_affected']}")
+            logger.info(f"Pages that would be affected: {preview['page_ranges_affected'] or 'none'}")
             return 0
         
         total_redacted = redactor.find_and_redact_text(
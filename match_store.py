@@ -0,0 +1,177 @@
+"""
+Match Store Module
+
+Contains the column-oriented store of matches that the redaction engine
+produces and its reports consume.
+"""
+
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from itertools import compress
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from page_text import BBox
+
+
+@dataclass(slots=True)
+class MatchRecord:
+    """One match, as read back from a MatchStore."""
+    pattern: str
+    # Page number, from 1
+    page: int
+    # One box per span the match covers
+    rects: List[BBox]
+    # Matched characters as they appear on the page, if kept
+    text: Optional[str] = None
+    
+    def to_dict(self) -> dict:
+        """Plain dictionary of the record, e.g. for one line of JSON."""
+        return {
+            "pattern": self.pattern,
+            "page": self.page,
+            # Boxes are stored as 32-bit floats; rounding drops the digits
+            # widening them back to doubles makes up
+            "rects": [[round(coordinate, 3) for coordinate in rect] for rect in self.rects],
+            "text": self.text
+        }
+
+
+class MatchStore:
+    """
+    Matches kept as columns of typed arrays instead of one object each.
+    
+    Every match is a row of pattern index, 0-based page and the range of its
+    boxes in the box columns. A match with one box costs 28 bytes however
+    many there are, and filtering or counting
+    runs over flat columns. Records are only built when a match is read back.
+    """
+    
+    def __init__(self, patterns: Sequence[str], keep_text: bool = False):
+        self.patterns = list(patterns)
+        
+        self.pattern_ids = array("i")
+        self.page_nums = array("i")
+        # Boxes of match i are at box_offsets[i]:box_offsets[i + 1]
+        self.box_offsets = array("i", [0])
+        self.x0 = array("f")
+        self.y0 = array("f")
+        self.x1 = array("f")
+        self.y1 = array("f")
+        
+        # Matched texts, only kept when asked for
+        self.texts: Optional[List[str]] = [] if keep_text else None
+    
+    def add(
+        self,
+        pattern_id: int,
+        page_num: int,
+        boxes: Iterable[BBox],
+        text: Optional[str] = None
+    ) -> None:
+        """Append a match with its boxes."""
+        self.pattern_ids.append(pattern_id)
+        self.page_nums.append(page_num)
+        
+        for x0, y0, x1, y1 in boxes:
+            self.x0.append(x0)
+            self.y0.append(y0)
+            self.x1.append(x1)
+            self.y1.append(y1)
+        self.box_offsets.append(len(self.x0))
+        
+        if self.texts is not None:
+            self.texts.append(text)
+    
+    def extend(self, other: 'MatchStore') -> None:
+        """Append every match of another store over the same patterns."""
+        base = len(self.x0)
+        for name in ("pattern_ids", "page_nums", "x0", "y0", "x1", "y1"):
+            getattr(self, name).extend(getattr(other, name))
+        self.box_offsets.extend(base + offset for offset in other.box_offsets[1:])
+        
+        if self.texts is not None:
+            self.texts.extend(other.texts if other.texts is not None else [None] * len(other))
+    
+    def __len__(self) -> int:
+        return len(self.pattern_ids)
+    
+    def rects(self, index: int) -> List[BBox]:
+        """Boxes of one match."""
+        return [
+            (self.x0[box], self.y0[box], self.x1[box], self.y1[box])
+            for box in range(self.box_offsets[index], self.box_offsets[index + 1])
+        ]
+    
+    def all_rects(self) -> List[BBox]:
+        """Boxes of every match, in order."""
+        return list(zip(self.x0, self.y0, self.x1, self.y1))
+    
+    def __getitem__(self, index: int) -> MatchRecord:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("match index out of range")
+        
+        return MatchRecord(
+            self.patterns[self.pattern_ids[index]],
+            self.page_nums[index] + 1,
+            self.rects(index),
+            self.texts[index] if self.texts is not None else None
+        )
+    
+    def __iter__(self) -> Iterator[MatchRecord]:
+        for index in range(len(self)):
+            yield self[index]
+    
+    def select(self, mask: Iterable[bool]) -> 'MatchStore':
+        """A new store of the matches whose entry in a mask is true."""
+        selected = MatchStore(self.patterns, keep_text=self.texts is not None)
+        for index in compress(range(len(self)), mask):
+            selected.add(
+                self.pattern_ids[index], self.page_nums[index], self.rects(index),
+                self.texts[index] if self.texts is not None else None
+            )
+        return selected
+    
+    def filter(self, pattern_id: Optional[int] = None, page_nums: Optional[Iterable[int]] = None) -> 'MatchStore':
+        """A new store of the matches of one pattern, or on some 0-based pages, or both."""
+        mask = [True] * len(self)
+        if pattern_id is not None:
+            mask = [keep and current == pattern_id for keep, current in zip(mask, self.pattern_ids)]
+        if page_nums is not None:
+            pages = set(page_nums)
+            mask = [keep and page in pages for keep, page in zip(mask, self.page_nums)]
+        return self.select(mask)
+    
+    def counts(self) -> array:
+        """Number of matches of each pattern, by pattern index."""
+        counts = array("i", [0] * len(self.patterns))
+        for pattern_id, count in Counter(self.pattern_ids).items():
+            counts[pattern_id] = count
+        return counts
+    
+    def count_by_pattern(self) -> Dict[str, int]:
+        """Number of matches of each distinct pattern."""
+        counts = dict.fromkeys(self.patterns, 0)
+        for pattern_id, count in enumerate(self.counts()):
+            counts[self.patterns[pattern_id]] += count
+        return counts
+    
+    def boxes_by_pattern(self) -> Dict[str, List[List[BBox]]]:
+        """The boxes of each match, grouped by distinct pattern."""
+        grouped = {pattern: [] for pattern in self.patterns}
+        for index, pattern_id in enumerate(self.pattern_ids):
+            grouped[self.patterns[pattern_id]].append(self.rects(index))
+        return grouped
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the columns, excluding any kept texts."""
+        return sum(
+            column.itemsize * len(column)
+            for column in (
+                self.pattern_ids, self.page_nums, self.box_offsets,
+                self.x0, self.y0, self.x1, self.y1
+            )
+        )
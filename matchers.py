@@ -0,0 +1,867 @@
+"""
+Pattern Matching Module
+
+Contains the compiled multi-pattern matchers used by the redaction engine.
+"""
+
+import logging
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from re import _constants as sre_constants, _parser as sre_parser
+from typing import Dict, FrozenSet, Iterator, List, Optional, Pattern, Set, Tuple, Union
+
+from page_text import DIGIT_SEPARATORS, digit_clusters, project_text
+
+# Numbered back-references and conditionals change meaning once a pattern is
+# wrapped in an extra group, so such patterns are never merged.
+GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?\(\d")
+
+# Character class escapes that can stand in for a class when probing page text
+CATEGORY_PROBES = {
+    sre_constants.CATEGORY_DIGIT: r"\d",
+    sre_constants.CATEGORY_WORD: r"\w",
+    sre_constants.CATEGORY_SPACE: r"\s",
+}
+REPEATS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT, sre_constants.POSSESSIVE_REPEAT)
+
+WORD = re.compile(r"\w+")
+
+# Fuzzy matching allows at most one edit per this many characters of a
+# literal, so short literals stay exact instead of matching half the page
+CHARS_PER_EDIT = 4
+# Length of the q-grams counted to pick fuzzy candidates
+FUZZY_Q = 2
+
+# Template of a numeric pattern: a regex over digits only, the least and most
+# digits it can match, and whether a word boundary must open and close a hit
+DigitTemplate = Tuple[Pattern, int, int, bool, bool]
+
+# A pattern's requirements: literals that must all occur, character classes
+# (as regex sources) that must all occur, and whether to compare ignoring case
+Requirements = Tuple[FrozenSet[str], FrozenSet[str], bool]
+
+
+def _is_word_char(char: str) -> bool:
+    """Whether a character counts as a word character for ``\\b``."""
+    return char.isalnum() or char == "_"
+
+
+def _is_boundary(text: str, pos: int) -> bool:
+    """Whether a word boundary falls between text[pos - 1] and text[pos]."""
+    before = pos > 0 and _is_word_char(text[pos - 1])
+    after = pos < len(text) and _is_word_char(text[pos])
+    return before != after
+
+
+def _is_digit_item(op, av) -> bool:
+    """Whether a parsed class member only matches decimal digits."""
+    if op is sre_constants.LITERAL:
+        return chr(av).isdecimal()
+    if op is sre_constants.RANGE:
+        return ord("0") <= av[0] <= av[1] <= ord("9")
+    return op is sre_constants.CATEGORY and av is sre_constants.CATEGORY_DIGIT
+
+
+def _is_separator_item(op, av) -> bool:
+    """Whether a parsed class member only matches characters that separate digit groups."""
+    if op is sre_constants.LITERAL:
+        return chr(av) in DIGIT_SEPARATORS
+    return op is sre_constants.CATEGORY and av is sre_constants.CATEGORY_SPACE
+
+
+def _digit_source(items: list) -> Optional[Tuple[str, int, int]]:
+    """
+    Rewrite a parsed sequence as a regex over digits alone, dropping separators.
+    
+    Returns:
+        Tuple of (regex source, least digits, most digits), or None if the
+        sequence needs anything but digits and separators
+    """
+    parts = []
+    least = most = 0
+    
+    for op, av in items:
+        if op is sre_constants.AT:
+            # Anchors depend on the text around the digits, which is gone
+            return None
+        elif op is sre_constants.LITERAL:
+            if chr(av).isdecimal():
+                parts.append(chr(av))
+                least += 1
+                most += 1
+            elif chr(av) not in DIGIT_SEPARATORS:
+                return None
+        elif op is sre_constants.IN:
+            if all(_is_digit_item(*item) for item in av):
+                parts.append(Prefilter._class_probe(av))
+                least += 1
+                most += 1
+            elif not all(_is_separator_item(*item) for item in av):
+                return None
+        elif op in REPEATS:
+            min_count, max_count, body = av
+            inner = _digit_source(list(body))
+            if inner is None:
+                return None
+            if inner[2]:
+                unbounded = max_count is sre_constants.MAXREPEAT
+                upper = "" if unbounded else max_count
+                parts.append(f"(?:{inner[0]}){{{min_count},{upper}}}")
+                least += inner[1] * min_count
+                most = sys.maxsize if unbounded else most + inner[2] * max_count
+        elif op is sre_constants.SUBPATTERN:
+            inner = _digit_source(list(av[-1]))
+            if inner is None:
+                return None
+            parts.append(f"(?:{inner[0]})")
+            least += inner[1]
+            most += inner[2]
+        elif op is sre_constants.BRANCH:
+            inners = [_digit_source(list(branch)) for branch in av[1]]
+            if any(inner is None for inner in inners):
+                return None
+            parts.append("(?:" + "|".join(inner[0] for inner in inners) + ")")
+            least += min(inner[1] for inner in inners)
+            most += max(inner[2] for inner in inners)
+        else:
+            return None
+    
+    return "".join(parts), least, min(most, sys.maxsize)
+
+
+def digit_template(pattern: str) -> Optional[DigitTemplate]:
+    """
+    Turn a numeric pattern into a template matched against digits alone.
+    
+    A pattern is numeric when it consists of nothing but digits, separators
+    such as "-", "." and spaces, and word boundaries at either end, e.g. the
+    phone number pattern ``\\(?\\d{3}\\)?[-.\\s]?\\d{3}[-.\\s]?\\d{4}``. Its
+    template ``\\d{3}\\d{3}\\d{4}`` then matches however the digits are
+    separated. The word boundaries are checked against the text around each
+    hit; any other anchor keeps the pattern a regex.
+    
+    Returns:
+        Tuple of (compiled digit regex, least digits, most digits, boundary
+        at the start, boundary at the end), or None if the pattern is not
+        numeric
+    """
+    try:
+        items = list(sre_parser.parse(pattern))
+        bounded = []
+        for position in (0, -1):
+            bounded.append(bool(items) and items[position] == (sre_constants.AT, sre_constants.AT_BOUNDARY))
+            if bounded[-1]:
+                del items[position]
+        
+        result = _digit_source(items)
+        if result is None or not result[2]:
+            return None
+        return re.compile(result[0]), result[1], result[2], bounded[0], bounded[1]
+    except Exception:
+        # The parser is internal to re; any surprise just keeps the pattern a regex
+        return None
+
+
+class RegexPatternSet:
+    """
+    A list of regex patterns compiled once per run and scanned together.
+    
+    The member patterns are merged into a single alternation with one named
+    group per pattern, so text without any match costs a single scan no matter
+    how many patterns there are. Text that does match is rescanned by each
+    member from the first hit onwards, so overlapping matches of different
+    patterns are all reported and attributed to the pattern that produced them.
+    
+    With ``ignore_accents`` the patterns have their accents stripped like the
+    text they are run against. Regex syntax is plain ASCII, which stripping
+    leaves untouched. With ``digit_projection`` numeric patterns are matched
+    by their digits alone, against the numbers of the text with separators
+    removed, so one pattern covers "555-123-4567" and "(555) 123 4567".
+    
+    ``order`` lists the pattern indices in the order members are scanned and
+    reported, so a caller that stops at the first hit can try the cheapest
+    way to one first. With ``timed`` the time spent scanning each member on
+    its own is added up in ``seconds``.
+    """
+    
+    def __init__(
+        self,
+        patterns: List[str],
+        case_sensitive: bool = True,
+        whole_words_only: bool = False,
+        ignore_accents: bool = False,
+        digit_projection: bool = False,
+        order: Optional[List[int]] = None,
+        timed: bool = False
+    ):
+        self.patterns = list(patterns)
+        self.logger = logging.getLogger(__name__)
+        self.flags = 0 if case_sensitive else re.IGNORECASE
+        self.ignore_accents = ignore_accents
+        sources = [
+            project_text(pattern, strip_accents=True)[0] if ignore_accents else pattern
+            for pattern in self.patterns
+        ]
+        
+        # Members merged into the combined alternation, and members that have
+        # to be scanned on their own
+        self._merged: List[Tuple[int, Pattern]] = []
+        self._separate: List[Tuple[int, Pattern]] = []
+        # Numeric members matched against digit clusters
+        self._numeric: List[Tuple[int, DigitTemplate]] = []
+        alternatives = {}
+        
+        for index, (pattern, source) in enumerate(zip(self.patterns, sources)):
+            if whole_words_only:
+                source = rf"\b(?:{source})\b"
+            
+            template = digit_template(source) if digit_projection else None
+            if template is not None:
+                self._numeric.append((index, template))
+                continue
+            
+            try:
+                compiled = re.compile(source, self.flags)
+            except re.error as e:
+                self.logger.error(f"Invalid regex pattern '{pattern}': {e}")
+                continue
+            
+            alternative = f"(?P<{self._group_name(index)}>{source})"
+            if GROUP_REFERENCE.search(source) or not self._compiles(alternative):
+                self._separate.append((index, compiled))
+            else:
+                self._merged.append((index, compiled))
+                alternatives[index] = alternative
+        
+        # Rules out the patterns a page cannot match from its plain text alone
+        self.prefilter = Prefilter(sources, case_sensitive)
+        for index, _ in self._numeric:
+            self.prefilter.require_digit(index)
+        
+        self.order = list(order) if order is not None else list(range(len(self.patterns)))
+        rank = {index: position for position, index in enumerate(self.order)}
+        for members in (self._merged, self._separate, self._numeric):
+            members.sort(key=lambda item: rank[item[0]])
+        
+        self._combined = None
+        if alternatives:
+            try:
+                self._combined = re.compile(
+                    "|".join(alternatives[index] for index, _ in self._merged), self.flags
+                )
+            except re.error:
+                # Clashing group names between patterns; scan them one by one
+                self._separate = sorted(self._separate + self._merged, key=lambda item: rank[item[0]])
+                self._merged = []
+        
+        # Every member in scan order, tagged with how it is scanned
+        self._members = sorted(
+            [(index, self._merge_scan, compiled) for index, compiled in self._merged]
+            + [(index, self._separate_scan, compiled) for index, compiled in self._separate]
+            + [(index, self._numeric_scan, template) for index, template in self._numeric],
+            key=lambda item: rank[item[0]]
+        )
+        self.seconds: Optional[List[float]] = [0.0] * len(self.patterns) if timed else None
+    
+    @staticmethod
+    def _group_name(index: int) -> str:
+        """Name of the combined-pattern group that attributes hits to a pattern."""
+        return f"_p{index}"
+    
+    def _compiles(self, source: str) -> bool:
+        """Check whether a wrapped alternative compiles on its own."""
+        try:
+            re.compile(source, self.flags)
+        except re.error:
+            return False
+        return True
+    
+    def __len__(self) -> int:
+        return len(self._merged) + len(self._separate) + len(self._numeric)
+    
+    def first_hit(self, text: str) -> Optional[Tuple[int, int]]:
+        """
+        Find the leftmost hit of any merged pattern in a single scan.
+        
+        Returns:
+            Tuple of (pattern index, start offset), or None if nothing matches
+        """
+        if self._combined is None:
+            return None
+        
+        match = self._combined.search(text)
+        if match is None:
+            return None
+        
+        return int(match.lastgroup[2:]), match.start()
+    
+    def finditer(self, text: str, only: Optional[Set[int]] = None) -> Iterator[Tuple[int, int, int]]:
+        """
+        Find all non-empty matches of every pattern in the text.
+        
+        Members are scanned in the set's order, one after another, so a
+        caller that stops early never runs the members after its last hit.
+        
+        Args:
+            text: Text to scan
+            only: Indices of the patterns to report, or None for all of them
+        
+        Yields:
+            Tuples of (pattern index, start offset, end offset)
+        """
+        # Shared work, done once for all members that need it: the leftmost
+        # hit of the alternation and the digit clusters of the text
+        shared = {}
+        
+        for index, scan, member in self._members:
+            if only is not None and index not in only:
+                continue
+            
+            if self.seconds is None:
+                yield from scan(index, member, text, shared)
+                continue
+            
+            started = time.perf_counter()
+            matches = list(scan(index, member, text, shared))
+            self.seconds[index] += time.perf_counter() - started
+            yield from matches
+    
+    def _merge_scan(self, index: int, compiled: Pattern, text: str, shared: dict) -> Iterator[Tuple[int, int, int]]:
+        """Rescan a merged member, from the leftmost hit of the alternation onwards."""
+        if "first_hit" not in shared:
+            shared["first_hit"] = self.first_hit(text)
+        hit = shared["first_hit"]
+        if hit is None:
+            return
+        
+        # No member can match before the leftmost hit of the alternation
+        for match in compiled.finditer(text, hit[1]):
+            if match.end() > match.start():
+                yield index, match.start(), match.end()
+    
+    @staticmethod
+    def _separate_scan(index: int, compiled: Pattern, text: str, shared: dict) -> Iterator[Tuple[int, int, int]]:
+        """Scan a member that could not be merged on its own."""
+        for match in compiled.finditer(text):
+            if match.end() > match.start():
+                yield index, match.start(), match.end()
+    
+    def _numeric_scan(self, index: int, template: DigitTemplate, text: str, shared: dict) -> Iterator[Tuple[int, int, int]]:
+        """Match a numeric member against the digits of the text."""
+        if "clusters" not in shared:
+            # The text is projected onto its digits once for all numeric members
+            shared["clusters"] = digit_clusters(text)
+        for start, end in self._digit_matches(text, shared["clusters"], template):
+            yield index, start, end
+    
+    @staticmethod
+    def _digit_matches(text: str, clusters: list, template: DigitTemplate) -> Iterator[Tuple[int, int]]:
+        """
+        Match a numeric template against digit clusters, mapping hits back to text offsets.
+        
+        A hit has to start and end on a boundary between digit groups, so a
+        ten-digit template never matches part of a longer unbroken number,
+        and on a word boundary of the text where the pattern asks for one.
+        The longest hit wins at each start, and hits do not overlap.
+        """
+        compiled, least, most, bounded_start, bounded_end = template
+        for digits, offsets, boundaries in clusters:
+            next_start = 0
+            for position, start in enumerate(boundaries[:-1]):
+                if start < next_start:
+                    continue
+                if bounded_start and not _is_boundary(text, offsets[start]):
+                    continue
+                for end in reversed(boundaries[position + 1:]):
+                    if end - start > most:
+                        continue
+                    if end - start < least:
+                        break
+                    if bounded_end and not _is_boundary(text, offsets[end - 1] + 1):
+                        continue
+                    if compiled.fullmatch(digits, start, end):
+                        yield offsets[start], offsets[end - 1] + 1
+                        next_start = end
+                        break
+
+
+class LiteralMatcher:
+    """
+    Aho-Corasick automaton over a list of literal patterns.
+    
+    The automaton is built once per run and finds every occurrence of every
+    literal in a single linear pass over the text, so the cost of a scan does
+    not grow with the number of literals. Whole-word matching is checked in
+    the same pass against the characters around each occurrence.
+    """
+    
+    def __init__(
+        self,
+        patterns: List[str],
+        case_sensitive: bool = True,
+        whole_words_only: bool = False,
+        ignore_accents: bool = False
+    ):
+        self.patterns = list(patterns)
+        self.case_sensitive = case_sensitive
+        self.whole_words_only = whole_words_only
+        self.ignore_accents = ignore_accents
+        
+        # Trie transitions, failure links and the pattern indices ending at each state
+        self._goto: List[dict] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        self._lengths: List[int] = []
+        
+        for index, pattern in enumerate(self.patterns):
+            literal = self._fold(pattern)
+            self._lengths.append(len(literal))
+            if literal:
+                self._insert(literal, index)
+        
+        self._link()
+    
+    def _fold(self, text: str) -> str:
+        """Apply the matcher's case and accent handling to a literal or to scanned text."""
+        return project_text(text, not self.case_sensitive, self.ignore_accents)[0]
+    
+    def _insert(self, literal: str, index: int) -> None:
+        """Add a literal to the trie."""
+        state = 0
+        for char in literal:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        
+        self._output[state] += (index,)
+    
+    def _link(self) -> None:
+        """Compute failure links breadth-first and merge outputs along them."""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+    
+    def finditer(self, text: str, folded: bool = False) -> Iterator[Tuple[int, int, int]]:
+        """
+        Find all occurrences of every literal in one pass over the text.
+        
+        Case- or accent-insensitive matchers project the text first, unless
+        ``folded`` says it already is; offsets are then offsets into the
+        projected text.
+        
+        Occurrences of the same literal do not overlap, matching the behaviour
+        of repeated substring search. In whole-word mode an occurrence needs
+        a word boundary at both ends, exactly as ``\\b`` defines one.
+        
+        Yields:
+            Tuples of (pattern index, start offset, end offset), by end offset
+        """
+        goto, fail, output, lengths = self._goto, self._fail, self._output, self._lengths
+        next_start = {}
+        state = 0
+        if not folded:
+            text = self._fold(text)
+        
+        for pos, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            
+            for index in output[state]:
+                start = pos + 1 - lengths[index]
+                if start < next_start.get(index, 0):
+                    continue
+                if self.whole_words_only and not (
+                    _is_boundary(text, start) and _is_boundary(text, pos + 1)
+                ):
+                    continue
+                next_start[index] = pos + 1
+                yield index, start, pos + 1
+    
+    def present(self, text: str) -> Set[int]:
+        """Return the indices of all literals that occur in the text."""
+        return {index for index, _, _ in self.finditer(text)}
+
+
+class SearchMatcher(LiteralMatcher):
+    """
+    Automaton over literals that MuPDF's search will locate on the page.
+    
+    ``page.search_for`` ignores case and lets any run of whitespace, line
+    breaks included, stand for the whitespace in a literal, so a hit can
+    continue on the next line. This matcher folds and collapses both the
+    literals and the scanned text the same way, so scanning a page's whole
+    text tells which literals search will find there without ever missing one.
+    """
+    
+    def __init__(self, patterns: List[str], whole_words_only: bool = False):
+        super().__init__(patterns, case_sensitive=False, whole_words_only=whole_words_only)
+    
+    def _fold(self, text: str) -> str:
+        return project_text(" ".join(text.split()), casefold=True)[0]
+    
+    @staticmethod
+    def is_whole_word(text: str, start: int, end: int) -> bool:
+        """Whether word boundaries fall at both ends of a span, as ``\\b`` defines them."""
+        return _is_boundary(text, start) and _is_boundary(text, end)
+
+
+class Prefilter:
+    """
+    Cheap page test derived from what each regex pattern cannot match without.
+    
+    Every pattern is parsed once into the literals and character classes that
+    any match of it must contain, e.g. "@" and "." for an email address or a
+    digit for a phone number. A page whose plain text lacks one of them cannot
+    match the pattern, so it can be ruled out before its structured text is
+    extracted. Patterns whose requirements cannot be derived always pass.
+    """
+    
+    def __init__(self, patterns: List[str], case_sensitive: bool = True):
+        self.patterns = list(patterns)
+        self.case_sensitive = case_sensitive
+        # Set while deriving a pattern that turns on case folding inline
+        self._ignore_case = False
+        self.requirements: List[Optional[Requirements]] = [
+            self._derive(pattern) for pattern in self.patterns
+        ]
+        
+        # Probes shared by several patterns are compiled, and run, once
+        self._probes: Dict[Tuple[str, bool], Pattern] = {}
+        for requirement in self.requirements:
+            if requirement is None:
+                continue
+            _, probes, ignore_case = requirement
+            for source in probes:
+                key = (source, ignore_case)
+                if key not in self._probes:
+                    self._probes[key] = re.compile(source, re.IGNORECASE if ignore_case else 0)
+    
+    def require_digit(self, index: int) -> None:
+        """Reduce a pattern's requirements to a single digit, e.g. when it is matched by digits alone."""
+        probe = CATEGORY_PROBES[sre_constants.CATEGORY_DIGIT]
+        self.requirements[index] = (frozenset(), frozenset([probe]), False)
+        self._probes.setdefault((probe, False), re.compile(probe))
+    
+    def _derive(self, pattern: str) -> Optional[Requirements]:
+        """Parse a pattern into its requirements, or None if they cannot be derived."""
+        flags = 0 if self.case_sensitive else re.IGNORECASE
+        try:
+            parsed = sre_parser.parse(pattern, flags)
+            self._ignore_case = bool(parsed.state.flags & re.IGNORECASE)
+            literals, probes = self._sequence_requirements(list(parsed))
+        except Exception:
+            # The parser is internal to re; any surprise just disables the prefilter
+            return None
+        
+        ignore_case = self._ignore_case
+        if ignore_case:
+            literals = {literal.casefold() for literal in literals}
+        return frozenset(literals), frozenset(probes), ignore_case
+    
+    def _sequence_requirements(self, items: list) -> Tuple[Set[str], Set[str]]:
+        """Collect the requirements of a sequence of parsed regex items."""
+        literals: Set[str] = set()
+        probes: Set[str] = set()
+        run: List[str] = []
+        
+        for op, av in items:
+            if op is sre_constants.LITERAL:
+                run.append(chr(av))
+                continue
+            
+            # Anything but a literal ends the current run of adjacent literals
+            if run:
+                literals.add("".join(run))
+                run = []
+            
+            if op is sre_constants.IN:
+                probe = self._class_probe(av)
+                if probe is not None:
+                    probes.add(probe)
+            elif op in REPEATS:
+                min_count, _, body = av
+                if min_count >= 1:
+                    self._merge(literals, probes, self._sequence_requirements(list(body)))
+            elif op is sre_constants.SUBPATTERN:
+                _, add_flags, _, body = av
+                if add_flags & re.IGNORECASE:
+                    self._ignore_case = True
+                self._merge(literals, probes, self._sequence_requirements(list(body)))
+            elif op is sre_constants.ATOMIC_GROUP:
+                self._merge(literals, probes, self._sequence_requirements(list(av)))
+            elif op is sre_constants.BRANCH:
+                # Only what every alternative requires is required
+                branches = [self._sequence_requirements(list(branch)) for branch in av[1]]
+                literals |= set.intersection(*(branch[0] for branch in branches))
+                probes |= set.intersection(*(branch[1] for branch in branches))
+        
+        if run:
+            literals.add("".join(run))
+        
+        return literals, probes
+    
+    @staticmethod
+    def _merge(literals: Set[str], probes: Set[str], requirements: Tuple[Set[str], Set[str]]) -> None:
+        """Add the requirements of a nested item to those of its sequence."""
+        literals |= requirements[0]
+        probes |= requirements[1]
+    
+    @staticmethod
+    def _class_probe(items: list) -> Optional[str]:
+        """Turn a parsed character class into a regex source that finds any of its members."""
+        parts = []
+        for op, av in items:
+            if op is sre_constants.LITERAL:
+                parts.append(re.escape(chr(av)))
+            elif op is sre_constants.RANGE:
+                parts.append(f"{re.escape(chr(av[0]))}-{re.escape(chr(av[1]))}")
+            elif op is sre_constants.CATEGORY and av in CATEGORY_PROBES:
+                parts.append(CATEGORY_PROBES[av])
+            else:
+                # Negated classes and the like rule nothing out
+                return None
+        
+        if len(parts) == 1 and parts[0] in CATEGORY_PROBES.values():
+            return parts[0]
+        return f"[{''.join(parts)}]"
+    
+    def candidates(self, text: str, folded: Optional[str] = None) -> Set[int]:
+        """
+        Return the indices of the patterns that may match somewhere in the text.
+        
+        Args:
+            text: Text to check
+            folded: The text already casefolded, if at hand
+        """
+        seen_literals: Dict[Tuple[str, bool], bool] = {}
+        seen_probes: Dict[Tuple[str, bool], bool] = {}
+        result = set()
+        
+        for index, requirement in enumerate(self.requirements):
+            if requirement is None:
+                result.add(index)
+                continue
+            
+            literals, probes, ignore_case = requirement
+            if ignore_case and folded is None:
+                folded = text.casefold()
+            haystack = folded if ignore_case else text
+            
+            possible = True
+            for literal in literals:
+                key = (literal, ignore_case)
+                if key not in seen_literals:
+                    seen_literals[key] = literal in haystack
+                if not seen_literals[key]:
+                    possible = False
+                    break
+            
+            if possible:
+                for source in probes:
+                    key = (source, ignore_case)
+                    if key not in seen_probes:
+                        seen_probes[key] = self._probes[key].search(text) is not None
+                    if not seen_probes[key]:
+                        possible = False
+                        break
+            
+            if possible:
+                result.add(index)
+        
+        return result
+
+
+def _qgrams(text: str) -> Counter:
+    """Count the q-grams of a text."""
+    return Counter(text[start:start + FUZZY_Q] for start in range(len(text) - FUZZY_Q + 1))
+
+
+def edit_distance(masks: Dict[str, int], length: int, text: str) -> int:
+    """
+    Levenshtein distance between a literal and a text, computed bit-parallel.
+    
+    This is Myers' algorithm in Hyyrö's formulation: one column of the
+    dynamic programming matrix is held as bit vectors of vertical deltas,
+    so each text character costs a handful of integer operations whatever
+    the literal's length.
+    
+    Args:
+        masks: Bit mask of the positions of each character in the literal
+        length: Length of the literal
+        text: Text to compare the literal with
+    """
+    if not length:
+        return len(text)
+    
+    all_bits = (1 << length) - 1
+    top_bit = 1 << (length - 1)
+    positive, negative = all_bits, 0
+    score = length
+    
+    for char in text:
+        equal = masks.get(char, 0)
+        vertical = equal | negative
+        horizontal = (((equal & positive) + positive) ^ positive) | equal
+        horizontal_positive = negative | (~(horizontal | positive) & all_bits)
+        horizontal_negative = positive & horizontal
+        
+        if horizontal_positive & top_bit:
+            score += 1
+        elif horizontal_negative & top_bit:
+            score -= 1
+        
+        # The first row of the matrix grows by one per text character
+        horizontal_positive = ((horizontal_positive << 1) | 1) & all_bits
+        horizontal_negative = (horizontal_negative << 1) & all_bits
+        positive = horizontal_negative | (~(vertical | horizontal_positive) & all_bits)
+        negative = horizontal_positive & vertical
+    
+    return score
+
+
+class FuzzyMatcher:
+    """
+    Finds literals, such as names, within a bounded edit distance.
+    
+    The text is cut into windows of whole words, as many as the literal has
+    and one more or fewer, so split and merged words are found too. A window
+    is only compared with the literals that share enough q-grams with it: a
+    text within k edits of a literal of length m shares at least
+    m - q + 1 - k * q of its q-grams. An inverted q-gram index per window
+    size and literal length finds those literals without visiting the
+    others, nor any literal too long or short for the window; the survivors
+    are verified with the bit-parallel edit distance. Literals too short for
+    the bound to demand any shared q-gram are tried on every window.
+    
+    Offers the same interface as LiteralMatcher.
+    """
+    
+    def __init__(
+        self,
+        patterns: List[str],
+        max_edits: int,
+        case_sensitive: bool = True,
+        whole_words_only: bool = False,
+        ignore_accents: bool = False
+    ):
+        self.patterns = list(patterns)
+        self.max_edits = max_edits
+        self.case_sensitive = case_sensitive
+        self.whole_words_only = whole_words_only
+        self.ignore_accents = ignore_accents
+        
+        # Per literal: length, edits allowed, q-grams it must share, character masks
+        self._lengths: List[int] = []
+        self._edits: List[int] = []
+        self._thresholds: List[int] = []
+        self._masks: List[Dict[str, int]] = []
+        # (window size in words, literal length) -> q-gram -> (literal index,
+        # occurrences in the literal), for the literals tried on such windows
+        self._postings: Dict[Tuple[int, int], Dict[str, List[Tuple[int, int]]]] = {}
+        # Window size in words -> literals the q-gram bound cannot filter
+        self._unfiltered: Dict[int, List[int]] = {}
+        
+        for index, pattern in enumerate(self.patterns):
+            literal = self._fold(pattern)
+            edits = min(max_edits, len(literal) // CHARS_PER_EDIT)
+            words = len(WORD.findall(literal))
+            
+            masks: Dict[str, int] = {}
+            for position, char in enumerate(literal):
+                masks[char] = masks.get(char, 0) | (1 << position)
+            
+            self._lengths.append(len(literal))
+            self._edits.append(edits)
+            self._thresholds.append(len(literal) - FUZZY_Q + 1 - edits * FUZZY_Q)
+            self._masks.append(masks)
+            
+            if not words:
+                continue
+            for size in {max(words - 1, 1), words, words + 1} if edits else {words}:
+                if self._thresholds[index] <= 0:
+                    self._unfiltered.setdefault(size, []).append(index)
+                    continue
+                postings = self._postings.setdefault((size, len(literal)), {})
+                for gram, count in _qgrams(literal).items():
+                    postings.setdefault(gram, []).append((index, count))
+    
+    def _fold(self, text: str) -> str:
+        """Apply the matcher's case and accent handling to a literal or to scanned text."""
+        return project_text(text, not self.case_sensitive, self.ignore_accents)[0]
+    
+    def finditer(self, text: str, folded: bool = False) -> Iterator[Tuple[int, int, int]]:
+        """
+        Find the closest non-overlapping occurrences of every literal.
+        
+        Occurrences always consist of whole words. Offsets refer to the
+        projected text, as with LiteralMatcher.
+        
+        Yields:
+            Tuples of (pattern index, start offset, end offset)
+        """
+        if not folded:
+            text = self._fold(text)
+        words = [match.span() for match in WORD.finditer(text)]
+        
+        # literal index -> [(distance, start, end)]
+        found: Dict[int, List[Tuple[int, int, int]]] = defaultdict(list)
+        
+        for size in {size for size, _ in self._postings} | set(self._unfiltered):
+            unfiltered = self._unfiltered.get(size, [])
+            for first in range(len(words) - size + 1):
+                start, end = words[first][0], words[first + size - 1][1]
+                window = text[start:end]
+                grams = _qgrams(window)
+                
+                # Only literals of a length within reach that share a q-gram
+                # with the window are ever visited
+                shared: Dict[int, int] = defaultdict(int)
+                for length in range(len(window) - self.max_edits, len(window) + self.max_edits + 1):
+                    postings = self._postings.get((size, length))
+                    if postings is None:
+                        continue
+                    for gram, count in grams.items():
+                        for index, literal_count in postings.get(gram, ()):
+                            shared[index] += min(count, literal_count)
+                
+                candidates = [index for index, count in shared.items() if count >= self._thresholds[index]]
+                for index in candidates + unfiltered:
+                    edits = self._edits[index]
+                    if abs(len(window) - self._lengths[index]) > edits:
+                        continue
+                    distance = edit_distance(self._masks[index], self._lengths[index], window)
+                    if distance <= edits:
+                        found[index].append((distance, start, end))
+        
+        for index, hits in found.items():
+            # The closest hits win where windows overlap
+            taken: List[Tuple[int, int]] = []
+            for _, start, end in sorted(hits):
+                if all(end <= other_start or start >= other_end for other_start, other_end in taken):
+                    taken.append((start, end))
+            for start, end in sorted(taken):
+                yield index, start, end
+    
+    def present(self, text: str) -> Set[int]:
+        """Return the indices of all literals that occur in the text."""
+        return {index for index, _, _ in self.finditer(text)}
+
+
+# Matchers the literal path can use interchangeably
+TextMatcher = Union[LiteralMatcher, FuzzyMatcher]
@@ -0,0 +1,465 @@
+"""
+Page Text Module
+
+Contains the extracted-text model of a page and the cache that lets several
+passes over the same document share one extraction per page.
+"""
+
+import hashlib
+import sys
+import unicodedata
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import lru_cache
+from typing import AbstractSet, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+import pymupdf
+
+BBox = Tuple[float, float, float, float]
+
+# Characters that may separate the digit groups of one number, e.g. in
+# "(555) 123-4567" or "4111 1111 1111 1111"
+DIGIT_SEPARATORS = frozenset(" -./()\u00a0\u2010\u2011\u2012\u2013\u2014")
+
+# Boxes only merge when their vertical extents overlap by at least this share
+# of the shorter box, i.e. when they sit on the same line
+SAME_LINE_OVERLAP = 0.5
+
+
+def page_content_hash(page: pymupdf.Page) -> bytes:
+    """Hash a page's content streams, which is far cheaper than extracting its text."""
+    return hashlib.blake2b(page.read_contents(), digest_size=16).digest()
+
+
+@lru_cache(maxsize=4096)
+def _project_char(char: str, casefold: bool, strip_accents: bool) -> str:
+    """Project a single character; see project_text."""
+    if strip_accents:
+        char = "".join(
+            part for part in unicodedata.normalize("NFKD", char) if not unicodedata.combining(part)
+        )
+    if casefold:
+        char = char.casefold()
+    return char
+
+
+def project_text(text: str, casefold: bool = False, strip_accents: bool = False) -> Tuple[str, Optional[array]]:
+    """
+    Project a text for matching and map each projected character back to its original.
+    
+    Casefolding makes matching case-insensitive; stripping accents applies
+    NFKD compatibility decomposition and drops combining marks, so "José"
+    becomes "Jose" and a "ﬁ" ligature becomes "fi". A projection in which
+    every character maps to exactly one character needs no offset map.
+    
+    Returns:
+        Tuple of (projected text, offset in the original text of each
+        projected character followed by the original length, or None when
+        offsets are unchanged)
+    """
+    if not strip_accents or text.isascii():
+        # Casefolding never shortens a character, so equal lengths mean a
+        # one to one mapping
+        projected = text.casefold() if casefold else text
+        if len(projected) == len(text):
+            return projected, None
+    
+    pieces = [_project_char(char, casefold, strip_accents) for char in text]
+    projected = "".join(pieces)
+    if all(len(piece) == 1 for piece in pieces):
+        return projected, None
+    
+    offsets = array('i')
+    for index, piece in enumerate(pieces):
+        offsets.extend([index] * len(piece))
+    offsets.append(len(text))
+    return projected, offsets
+
+
+def original_span(offsets: Optional[array], start: int, end: int) -> Tuple[int, int]:
+    """
+    Map a match in a projected text back to the original characters it came from.
+    
+    A match that ends inside an expanded character covers all of it, and
+    one followed by dropped combining marks covers those marks too.
+    """
+    if offsets is None:
+        return start, end
+    if offsets[end] == offsets[end - 1]:
+        return offsets[start], offsets[end - 1] + 1
+    return offsets[start], offsets[end]
+
+
+def digit_clusters(text: str) -> List[Tuple[str, array, List[int]]]:
+    """
+    Project a text onto its numbers, keeping only their digits.
+    
+    Digit groups joined by nothing but separators form one cluster, so
+    "(555) 123 4567" becomes the cluster "5551234567" with group boundaries
+    at 0, 3, 6 and 10. Any other character ends a cluster.
+    
+    Returns:
+        List of (digits, offset in the text of each digit, group boundaries)
+    """
+    clusters = []
+    digits: List[str] = []
+    offsets = array('i')
+    boundaries: List[int] = []
+    separated = False
+    
+    for index, char in enumerate(text):
+        if char.isdecimal():
+            if separated or not digits:
+                boundaries.append(len(digits))
+            digits.append(char)
+            offsets.append(index)
+            separated = False
+        elif digits and char in DIGIT_SEPARATORS:
+            separated = True
+        elif digits:
+            boundaries.append(len(digits))
+            clusters.append(("".join(digits), offsets, boundaries))
+            digits, offsets, boundaries = [], array('i'), []
+            separated = False
+    
+    if digits:
+        boundaries.append(len(digits))
+        clusters.append(("".join(digits), offsets, boundaries))
+    
+    return clusters
+
+
+def merge_boxes(boxes: List[BBox], tolerance: float = 1.0) -> List[BBox]:
+    """
+    Merge boxes on the same line that overlap or lie within a tolerance of each other.
+    
+    Duplicate and contained boxes, such as a hit of one pattern inside a hit of
+    another, collapse into one box, as do adjacent hits on a line. Boxes on
+    different lines are never merged, so no text between them gets covered.
+    The boxes are swept once in x order, keeping only the merged boxes that
+    can still reach the current one.
+    """
+    merged = []
+    active = []
+    
+    for x0, y0, x1, y1 in sorted(boxes):
+        # Boxes ending left of this one can never grow again
+        active = [box for box in active if box[2] + tolerance >= x0]
+        
+        for box in active:
+            overlap = min(y1, box[3]) - max(y0, box[1])
+            if overlap >= SAME_LINE_OVERLAP * min(y1 - y0, box[3] - box[1]):
+                box[0] = min(box[0], x0)
+                box[1] = min(box[1], y0)
+                box[2] = max(box[2], x1)
+                box[3] = max(box[3], y1)
+                break
+        else:
+            box = [x0, y0, x1, y1]
+            merged.append(box)
+            active.append(box)
+    
+    return [tuple(box) for box in merged]
+
+
+class PageText:
+    """
+    Text extracted from one page: its plain text and, once needed, its geometry.
+    
+    The geometry is a character-level index built from MuPDF's ``rawdict``
+    output. The page is assembled into match units, one per line (or one per
+    block when ``join_blocks`` is set, with a space between its lines), stored
+    back to back in one string and separated by line breaks. Flat float arrays
+    hold the bounding box of every character, and an offset-to-span map lets
+    a match that crosses span boundaries be split back into one exact box per
+    span it touches. The index can be limited to the lines known to contain
+    hits, leaving every other line of the page out.
+    """
+    
+    def __init__(self, text: str, content_hash: Optional[bytes] = None, join_blocks: bool = False):
+        self.text = text
+        self.content_hash = content_hash
+        self.join_blocks = join_blocks
+        
+        # Character index: units back to back, the offsets where each unit and
+        # each span starts and ends, and one box coordinate per character.
+        # Separator characters have empty boxes and belong to no span.
+        self.chars: Optional[str] = None
+        # Texts of the lines the index was limited to, or None for all lines
+        self.geometry_lines: Optional[FrozenSet[str]] = None
+        self.unit_starts = array('i')
+        self.unit_ends = array('i')
+        self.span_starts = array('i')
+        self.span_ends = array('i')
+        self.x0 = array('f')
+        self.y0 = array('f')
+        self.x1 = array('f')
+        self.y1 = array('f')
+        
+        # Casefolded and accent-stripped projections, built once per page and
+        # mode on first use
+        self._projected_texts: Dict[Tuple[bool, bool], str] = {}
+        self._projected_units: Dict[Tuple[bool, bool], List[Tuple[int, str, Optional[array]]]] = {}
+    
+    @classmethod
+    def from_textpage(
+        cls,
+        textpage: pymupdf.TextPage,
+        with_geometry: bool = False,
+        content_hash: Optional[bytes] = None,
+        join_blocks: bool = False
+    ) -> 'PageText':
+        """Extract the plain text, and optionally the geometry, from a TextPage."""
+        page_text = cls(textpage.extractText(), content_hash, join_blocks)
+        if with_geometry:
+            page_text.add_geometry(textpage)
+        return page_text
+    
+    @property
+    def has_geometry(self) -> bool:
+        """Whether the character index has been built."""
+        return self.chars is not None
+    
+    def covers(self, lines: Optional[AbstractSet[str]] = None) -> bool:
+        """Whether the character index includes the given lines, or every line for None."""
+        if not self.has_geometry:
+            return False
+        if self.geometry_lines is None:
+            return True
+        return lines is not None and lines <= self.geometry_lines
+    
+    def add_geometry(self, textpage: pymupdf.TextPage, lines: Optional[AbstractSet[str]] = None) -> None:
+        """
+        Build the character index from the page's raw structured text.
+        
+        Args:
+            textpage: TextPage of the page
+            lines: Texts of the only lines to index, or None for the whole
+                page. Ignored when whole blocks are joined into units.
+        """
+        if self.join_blocks:
+            lines = None
+        self._reset_geometry()
+        
+        chars = []
+        found = set()
+        
+        for block in textpage.extractRAWDICT().get("blocks", []):
+            block_lines = block.get("lines", [])
+            if self.join_blocks:
+                units = [block_lines] if block_lines else []
+            else:
+                units = [[line] for line in block_lines]
+            
+            for unit in units:
+                if lines is not None:
+                    text = "".join(
+                        char["c"] for span in unit[0].get("spans", []) for char in span.get("chars", [])
+                    )
+                    if text not in lines:
+                        continue
+                    found.add(text)
+                
+                if chars:
+                    self._append_separator(chars, "\n")
+                self.unit_starts.append(len(chars))
+                
+                for line_index, line in enumerate(unit):
+                    if line_index:
+                        self._append_separator(chars, " ")
+                    
+                    for span in line.get("spans", []):
+                        self.span_starts.append(len(chars))
+                        for char in span.get("chars", []):
+                            x0, y0, x1, y1 = char["bbox"]
+                            chars.append(char["c"])
+                            self.x0.append(x0)
+                            self.y0.append(y0)
+                            self.x1.append(x1)
+                            self.y1.append(y1)
+                        self.span_ends.append(len(chars))
+                
+                self.unit_ends.append(len(chars))
+        
+        if lines is not None and len(found) < len(lines):
+            # The plain text and the structured text disagree about a line;
+            # index the whole page rather than risk missing a hit
+            self.add_geometry(textpage)
+            return
+        
+        self.chars = "".join(chars)
+        self.geometry_lines = frozenset(lines) if lines is not None else None
+    
+    def _reset_geometry(self) -> None:
+        """Drop the character index, e.g. before rebuilding it for more lines."""
+        self.chars = None
+        self.geometry_lines = None
+        self._projected_units = {}
+        for column in (
+            self.unit_starts, self.unit_ends, self.span_starts, self.span_ends,
+            self.x0, self.y0, self.x1, self.y1
+        ):
+            del column[:]
+    
+    def _append_separator(self, chars: List[str], separator: str) -> None:
+        """Add a character that joins text but has no geometry of its own."""
+        chars.append(separator)
+        for column in (self.x0, self.y0, self.x1, self.y1):
+            column.append(0.0)
+    
+    def iter_units(self) -> Iterator[Tuple[int, str]]:
+        """Yield (start offset, text) for every match unit of the page."""
+        for start, end in zip(self.unit_starts, self.unit_ends):
+            yield start, self.chars[start:end]
+    
+    def projected_text(self, casefold: bool = False, strip_accents: bool = False) -> str:
+        """The plain text projected by project_text; its lines match the plain text's line for line."""
+        key = (casefold, strip_accents)
+        if key not in self._projected_texts:
+            self._projected_texts[key] = project_text(self.text, casefold, strip_accents)[0]
+        return self._projected_texts[key]
+    
+    def projected_units(
+        self,
+        casefold: bool = False,
+        strip_accents: bool = False
+    ) -> List[Tuple[int, str, Optional[array]]]:
+        """
+        Return every match unit projected by project_text, projecting the page only once.
+        
+        Returns:
+            List of (start offset, projected text, offset map from project_text)
+        """
+        if not casefold and not strip_accents:
+            return [(start, text, None) for start, text in self.iter_units()]
+        
+        key = (casefold, strip_accents)
+        if key not in self._projected_units:
+            self._projected_units[key] = [
+                (start, *project_text(text, casefold, strip_accents)) for start, text in self.iter_units()
+            ]
+        return self._projected_units[key]
+    
+    def bboxes(self, start: int, end: int) -> List[BBox]:
+        """Return one exact box per span covered by the characters between two offsets."""
+        boxes = []
+        
+        index = max(bisect_right(self.span_starts, start) - 1, 0)
+        while index < len(self.span_starts) and self.span_starts[index] < end:
+            piece_start = max(start, self.span_starts[index])
+            piece_end = min(end, self.span_ends[index])
+            if piece_start < piece_end:
+                boxes.append((
+                    min(self.x0[piece_start:piece_end]),
+                    min(self.y0[piece_start:piece_end]),
+                    max(self.x1[piece_start:piece_end]),
+                    max(self.y1[piece_start:piece_end])
+                ))
+            index += 1
+        
+        return boxes
+    
+    def spans_within(self, rects: List[BBox]) -> List[Tuple[int, int]]:
+        """
+        Map boxes found on the page back to the characters they cover.
+        
+        Returns:
+            One (start, end) offset pair per box, spanning the characters
+            whose centres lie in it, or (0, 0) where none do
+        """
+        # Vertical extent of each unit, so a box is only compared with the
+        # characters of the units it overlaps
+        units = [
+            (start, end, min(self.y0[start:end]), max(self.y1[start:end]))
+            for start, end in zip(self.unit_starts, self.unit_ends) if start < end
+        ]
+        
+        spans = []
+        for x0, y0, x1, y1 in rects:
+            inside = [
+                index
+                for start, end, top, bottom in units if top <= y1 and bottom >= y0
+                for index in range(start, end)
+                if self.x0[index] < self.x1[index]
+                and x0 <= (self.x0[index] + self.x1[index]) / 2 <= x1
+                and y0 <= (self.y0[index] + self.y1[index]) / 2 <= y1
+            ]
+            spans.append((inside[0], inside[-1] + 1) if inside else (0, 0))
+        
+        return spans
+    
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by this page's text."""
+        size = sys.getsizeof(self.text)
+        if self.chars is not None:
+            size += sys.getsizeof(self.chars)
+        for projected in self._projected_texts.values():
+            size += sys.getsizeof(projected)
+        for units in self._projected_units.values():
+            for _, projected, offsets in units:
+                size += sys.getsizeof(projected)
+                if offsets is not None:
+                    size += offsets.buffer_info()[1] * offsets.itemsize
+        for column in (
+            self.unit_starts, self.unit_ends, self.span_starts, self.span_ends,
+            self.x0, self.y0, self.x1, self.y1
+        ):
+            size += column.buffer_info()[1] * column.itemsize
+        return size
+
+
+class PageTextCache:
+    """
+    LRU cache of extracted page text limited by a byte budget.
+    
+    Entries are keyed by page number and content hash, so an entry is only
+    reused for a page whose content is unchanged.
+    """
+    
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        # (page number, content hash) -> (page text, size charged to the budget)
+        self._entries: 'OrderedDict[Tuple[int, bytes], Tuple[PageText, int]]' = OrderedDict()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get(self, page_num: int, content_hash: bytes) -> Optional[PageText]:
+        """Return the cached text of a page, marking it as recently used."""
+        key = (page_num, content_hash)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[0]
+    
+    def put(self, page_num: int, content_hash: bytes, page_text: PageText) -> None:
+        """Store a page's text, evicting the least recently used pages over budget."""
+        key = (page_num, content_hash)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.current_bytes -= previous[1]
+        
+        size = page_text.nbytes
+        if size > self.max_bytes:
+            return
+        
+        self._entries[key] = (page_text, size)
+        self.current_bytes += size
+        
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_size
+    
+    def clear(self) -> None:
+        """Drop all cached pages."""
+        self._entries.clear()
+        self.current_bytes = 0
@@ -0,0 +1,145 @@
+"""
+Pattern Statistics Module
+
+Contains the per-pattern statistics recorded across runs, which the engine
+uses to try cheap patterns that usually hit before slow or rarely hitting ones.
+"""
+
+import json
+import logging
+import math
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional
+
+PATTERN_STATS_FILE = "pattern_stats.json"
+
+
+def default_stats_path(config_path: Optional[Path] = None) -> Path:
+    """Path of the statistics file, next to a config file or in the default config directory."""
+    if config_path is not None:
+        return Path(config_path).with_name(PATTERN_STATS_FILE)
+    return Path.home() / ".pdf_redactor" / PATTERN_STATS_FILE
+
+
+@dataclass
+class PatternRecord:
+    """What a pattern cost and found over all recorded runs."""
+    # Pages the pattern was matched against
+    pages: int = 0
+    # Pages the pattern had at least one hit on
+    pages_hit: int = 0
+    hits: int = 0
+    # Time spent matching the pattern on its own; patterns only ever matched
+    # together with others, like literals in one automaton, record none
+    seconds: float = 0.0
+    
+    @property
+    def hit_rate(self) -> float:
+        """Share of the pages matched against that had a hit."""
+        return self.pages_hit / self.pages if self.pages else 0.0
+    
+    @property
+    def seconds_per_page(self) -> float:
+        """Average time spent matching the pattern against one page."""
+        return self.seconds / self.pages if self.pages else 0.0
+    
+    @property
+    def seconds_per_hit(self) -> Optional[float]:
+        """Average time spent per hit found, or None if the pattern never hit."""
+        return self.seconds / self.hits if self.hits else None
+    
+    def expected_cost(self) -> float:
+        """Expected time spent on pages before the pattern finds a hit."""
+        if not self.pages_hit:
+            return math.inf
+        return self.seconds_per_page / self.hit_rate
+
+
+class PatternStats:
+    """
+    Statistics of every pattern seen, persisted as JSON between runs.
+    
+    Records are kept separately for each kind of matching ("regex",
+    "literal" or "fuzzy"), since the same pattern costs and finds different
+    things under each.
+    """
+    
+    def __init__(self, path: Path, records: Optional[Dict[str, Dict[str, PatternRecord]]] = None):
+        self.path = Path(path)
+        self.records: Dict[str, Dict[str, PatternRecord]] = records or {}
+    
+    @classmethod
+    def load(cls, path: Path) -> 'PatternStats':
+        """Load the statistics from a file, starting afresh if it is missing or unreadable."""
+        path = Path(path)
+        if not path.exists():
+            return cls(path)
+        
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            records = {
+                kind: {pattern: PatternRecord(**record) for pattern, record in patterns.items()}
+                for kind, patterns in data.items()
+            }
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logging.getLogger(__name__).warning(f"Ignoring unreadable pattern statistics {path}: {e}")
+            return cls(path)
+        
+        return cls(path, records)
+    
+    def save(self) -> None:
+        """Write the statistics to their file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            kind: {pattern: asdict(record) for pattern, record in patterns.items()}
+            for kind, patterns in self.records.items()
+        }
+        
+        with open(self.path, 'w') as f:
+            json.dump(data, f, indent=2)
+    
+    def reset(self) -> None:
+        """Forget every record and remove the file."""
+        self.records = {}
+        if self.path.exists():
+            self.path.unlink()
+    
+    def get(self, kind: str, pattern: str) -> Optional[PatternRecord]:
+        """Return the record of a pattern, or None if it was never recorded."""
+        return self.records.get(kind, {}).get(pattern)
+    
+    def record(
+        self,
+        kind: str,
+        pattern: str,
+        pages: int,
+        pages_hit: int,
+        hits: int,
+        seconds: float = 0.0
+    ) -> None:
+        """Add the results of one run to a pattern's record."""
+        record = self.records.setdefault(kind, {}).setdefault(pattern, PatternRecord())
+        record.pages += pages
+        record.pages_hit += pages_hit
+        record.hits += hits
+        record.seconds += seconds
+    
+    def order(self, kind: str, patterns: List[str]) -> List[int]:
+        """
+        Order pattern indices so the cheapest way to a hit is tried first.
+        
+        Patterns that have hit before come first, by expected time spent
+        before a hit. Patterns without a record follow in their given order,
+        and patterns that never hit go last.
+        """
+        def key(index: int):
+            record = self.get(kind, patterns[index])
+            if record is None or not record.pages:
+                return 1, 0.0, index
+            if not record.pages_hit:
+                return 2, 0.0, index
+            return 0, record.expected_cost(), index
+        
+        return sorted(range(len(patterns)), key=key)
@@ -5,21 +5,45 @@ Contains the core PDFRedactor class for handling PDF redaction operations.
 """
 
 import logging
+import math
+import multiprocessing
 import os
-import re
 import subprocess
 import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional, Tuple, Iterator
+from typing import Dict, FrozenSet, List, Optional, Sequence, Set, Tuple, Iterator
 
 import pymupdf
 from tqdm import tqdm
 
+from matchers import FuzzyMatcher, LiteralMatcher, RegexPatternSet, SearchMatcher, TextMatcher
+from hit_matrix import HitMatrix
+from match_store import MatchRecord, MatchStore
+from page_text import PageText, PageTextCache, merge_boxes, original_span, page_content_hash
+from pattern_stats import PatternStats
+from sampling import CONFIDENCE, stratified_sample, total_interval, wilson_interval
+from text_index import TextIndex, TextIndexWriter, file_sha256
+
 # Constants
 DEFAULT_OUTPUT_SUFFIX = "_redacted"
 QPDF_SUCCESS_CODES = {0, 2, 3}  # 0=success, 2=recoverable errors, 3=warnings
 MB_DIVISOR = 1024 * 1024
+DEFAULT_MERGE_TOLERANCE = 1.0  # points
+
+# Flags of the TextPage shared by all extractions of a page: MuPDF's search
+# settings, which dehyphenate and expand ligatures
+TEXTPAGE_FLAGS = pymupdf.TEXTFLAGS_SEARCH
+
+# Most consecutive pages a worker scans as one task of a parallel scan, and
+# tasks in flight per worker; together they bound the matches held at once
+PARALLEL_CHUNK_PAGES = 16
+PARALLEL_TASKS_PER_WORKER = 2
 
 
 class RedactionError(Exception):
@@ -27,15 +51,135 @@ class RedactionError(Exception):
     pass
 
 
+def _page_number(token: str, page_count: int) -> int:
+    """Resolve one page of a page range, where "end" is the last page."""
+    token = token.strip().lower()
+    if token == "end":
+        return page_count
+    if not token.isdigit() or int(token) < 1:
+        raise ValueError(f"Invalid page number '{token}'")
+    return int(token)
+
+
+def parse_page_ranges(spec: str, page_count: int) -> List[int]:
+    """
+    Parse a page selection such as "1-3,200-end" into page indices.
+    
+    Pages are numbered from 1 and "end" stands for the last page. Pages past
+    the end of the document are dropped.
+    
+    Returns:
+        Sorted, distinct 0-based page indices
+    
+    Raises:
+        ValueError: If the selection is malformed
+    """
+    pages = set()
+    for part in spec.split(","):
+        first, dash, last = part.partition("-")
+        start = _page_number(first, page_count)
+        end = _page_number(last, page_count) if dash else start
+        if end < start and last.strip().lower() != "end":
+            raise ValueError(f"Invalid page range '{part.strip()}'")
+        pages.update(range(start - 1, min(end, page_count)))
+    
+    return sorted(pages)
+
+
+@dataclass
+class ScanStats:
+    """Statistics of the most recent scan over a document."""
+    pages_total: int = 0
+    # Pages whose character geometry had to be extracted
+    pages_extracted: int = 0
+    # Pages each pattern was ruled out on from the plain text alone
+    pages_skipped: Dict[str, int] = field(default_factory=dict)
+    # Pages the text index ruled out for every pattern at once
+    pages_ruled_out: int = 0
+    # Processes the pages were scanned in
+    workers: int = 1
+    # Time spent scanning pages, added up over all workers, and the time
+    # the scan took from start to end
+    scan_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    
+    @property
+    def speedup(self) -> float:
+        """How many times faster the scan ran than one process scanning every page."""
+        return self.scan_seconds / self.wall_seconds if self.wall_seconds else 1.0
+
+
 class PDFRedactor:
     """Handles PDF redaction operations with PyMuPDF and qpdf optimization."""
     
-    def __init__(self, input_file: Path, output_file: Optional[Path] = None, show_progress: bool = True):
+    def __init__(
+        self,
+        input_file: Path,
+        output_file: Optional[Path] = None,
+        show_progress: bool = True,
+        text_cache_mb: Optional[float] = None,
+        join_blocks: bool = False,
+        merge_tolerance: float = DEFAULT_MERGE_TOLERANCE,
+        text_index: Optional[Path] = None,
+        ignore_accents: bool = False,
+        digit_projection: bool = False,
+        max_edits: int = 0,
+        pattern_stats: Optional[Path] = None,
+        pages: Optional[str] = None,
+        workers: int = 1
+    ):
         self.input_file = Path(input_file)
         self.output_file = output_file or self._generate_output_filename()
         self.show_progress = show_progress
         self.logger = logging.getLogger(__name__)
         
+        # Match each text block as a whole rather than line by line, so that
+        # matches can continue across line breaks
+        self.join_blocks = join_blocks
+        
+        # Match patterns against text with accents stripped and ligatures
+        # expanded, so that one pattern covers every accented variant
+        self.ignore_accents = ignore_accents
+        
+        # Match numeric regexes by their digits alone, whatever separates them
+        self.digit_projection = digit_projection
+        
+        # Edits allowed when matching literals, e.g. for names garbled by OCR
+        if max_edits < 0:
+            raise ValueError("max_edits must not be negative")
+        self.max_edits = max_edits
+        
+        # Gap, in points, within which boxes on one line merge into one annotation
+        self.merge_tolerance = merge_tolerance
+        
+        # Optional cache of extracted page text shared by all passes over the
+        # input, e.g. a preview followed by the actual redaction
+        self.text_cache = None
+        if text_cache_mb:
+            self.text_cache = PageTextCache(int(text_cache_mb * MB_DIVISOR))
+        
+        # Optional on-disk index of the input's extracted text, reused by
+        # later runs over the same file instead of extracting it again
+        self.text_index_path = Path(text_index) if text_index else None
+        self._text_index: Optional[TextIndex] = None
+        self._index_writer: Optional[TextIndexWriter] = None
+        
+        # Pages to scan, as a selection such as "1-3,200-end"; all other
+        # pages are never loaded and pass through to the output untouched
+        self.pages = pages
+        
+        # Processes to scan the pages in; each opens the document itself and
+        # scans chunks of consecutive pages as they are handed out
+        self.workers = max(1, workers)
+        self._file_hash: Optional[bytes] = None
+        
+        # Optional per-pattern statistics kept across runs, used to try the
+        # cheapest way to a hit first
+        self.pattern_stats = PatternStats.load(pattern_stats) if pattern_stats else None
+        
+        # Statistics of the last preview or redaction run
+        self.last_scan_stats = ScanStats()
+        
         if not self.input_file.exists():
             raise FileNotFoundError(f"Input file not found: {self.input_file}")
     
@@ -70,7 +214,8 @@ class PDFRedactor:
         
         Args:
             text_patterns: List of text patterns to redact
-            case_sensitive: Whether search should be case sensitive
+            case_sensitive: Whether regexes should be case sensitive; literals
+                always ignore case, as MuPDF's search does
             use_regex: Whether to treat patterns as regex
             whole_words_only: Whether to match whole words only
             
@@ -78,40 +223,33 @@ class PDFRedactor:
             Total number of instances redacted
         """
         self.logger.info(f"Opening PDF: {self.input_file}")
+        doc = self._open_document()
         
-        try:
-            doc = pymupdf.open(str(self.input_file))
-        except Exception as e:
-            raise RedactionError(f"Failed to open PDF: {e}")
-        
+        pattern_counts = {pattern: 0 for pattern in text_patterns}
         total_redacted = 0
         
         try:
-            # Create overall progress bar for patterns
-            pattern_pbar = tqdm(
-                text_patterns, 
-                desc="Processing patterns", 
-                disable=not self.show_progress,
-                unit="pattern"
-            )
+            self.logger.info(f"Searching for {len(text_patterns)} pattern(s): {text_patterns}")
             
-            for pattern in pattern_pbar:
-                pattern_pbar.set_description(f"Processing pattern: '{pattern}'")
-                self.logger.info(f"Searching for pattern: '{pattern}'")
+            for page_num, page, page_matches in self._scan_document(
+                doc, text_patterns, case_sensitive, use_regex, whole_words_only,
+                desc="Redacting pages"
+            ):
+                if not page_matches:
+                    continue
                 
-                pattern_redacted = self._redact_pattern(
-                    doc, pattern, case_sensitive, use_regex, whole_words_only
-                )
-                total_redacted += pattern_redacted
-                self.logger.info(f"Redacted {pattern_redacted} instances of '{pattern}'")
+                for pattern, count in page_matches.count_by_pattern().items():
+                    if count:
+                        self.logger.debug(f"  '{pattern}' found on page {page_num + 1}: {count} instance(s)")
+                        pattern_counts[pattern] += count
+                total_redacted += len(page_matches)
                 
-                # Update pattern progress bar with current stats
-                pattern_pbar.set_postfix({
-                    'found': pattern_redacted,
-                    'total': total_redacted
-                })
+                # Redact the boxes of all patterns at once, so the page's
+                # content stream is only rewritten once
+                self._apply_page_redactions(page, page_matches.all_rects())
             
-            pattern_pbar.close()
+            for pattern, count in pattern_counts.items():
+                self.logger.info(f"Redacted {count} instances of '{pattern}'")
             
             # Show optimization progress
             if self.show_progress:
@@ -124,172 +262,758 @@ class PDFRedactor:
         
         return total_redacted
     
-    def _redact_pattern(
-        self, 
-        doc: pymupdf.Document, 
-        pattern: str, 
+    def _apply_page_redactions(self, page: pymupdf.Page, rects: List) -> None:
+        """Merge overlapping rectangles, annotate them and apply them in a single step."""
+        merged = merge_boxes(rects, self.merge_tolerance)
+        self.logger.debug(f"  {len(rects)} match box(es) merged into {len(merged)} annotation(s)")
+        
+        for rect in merged:
+            page.add_redact_annot(rect)
+        
+        page.apply_redactions()
+    
+    def _open_document(self) -> pymupdf.Document:
+        """Open the input PDF, wrapping failures in RedactionError."""
+        try:
+            return pymupdf.open(str(self.input_file))
+        except Exception as e:
+            raise RedactionError(f"Failed to open PDF: {e}")
+    
+    def _scan_document(
+        self,
+        doc: pymupdf.Document,
+        text_patterns: List[str],
         case_sensitive: bool,
         use_regex: bool,
-        whole_words_only: bool
-    ) -> int:
-        """Redact a specific pattern in the document."""
-        pattern_count = 0
-        search_flags = pymupdf.TEXT_DEHYPHENATE
+        whole_words_only: bool,
+        desc: str = "Scanning pages",
+        page_order: Optional[List[int]] = None,
+        with_text: bool = False
+    ) -> Iterator[Tuple[int, pymupdf.Page, MatchStore]]:
+        """
+        Scan the document page by page, running every pattern against each page.
+        
+        Each page is loaded and its text extracted once; all patterns are then
+        matched against that same extraction before moving to the next page.
+        With several workers the pages are handed out in chunks of at most
+        ``PARALLEL_CHUNK_PAGES`` consecutive pages scanned in parallel, and
+        their matches are still yielded in page order, so callers apply
+        exactly the same redactions in the same order.
+        
+        Args:
+            page_order: Pages to scan, or None for the page selection
+            with_text: Keep the matched text of each match
+        
+        Yields:
+            Tuples of (page number, page, MatchStore of the page's matches)
+            for every scanned page
+        """
+        found = 0
+        pages_hit = Counter()
+        hits = Counter()
+        # A pattern given twice is matched, and counted, once
+        text_patterns = list(dict.fromkeys(text_patterns))
+        if page_order is None:
+            page_order = self._selected_pages(len(doc))
+        workers = min(self.workers, len(page_order)) or 1
+        stats = ScanStats(
+            pages_total=len(page_order), pages_skipped={pattern: 0 for pattern in text_patterns}, workers=workers
+        )
+        self.last_scan_stats = stats
+        
+        regex_set, literal_matcher = self._build_matchers(
+            text_patterns, case_sensitive, use_regex, whole_words_only
+        )
         
-        # Create progress bar for pages
         page_pbar = tqdm(
-            range(len(doc)), 
-            desc=f"Scanning pages for '{pattern[:20]}{'...' if len(pattern) > 20 else ''}'",
+            total=len(page_order),
+            desc=desc,
             disable=not self.show_progress,
-            unit="page",
-            leave=False
+            unit="page"
         )
         
-        for page_num in page_pbar:
-            page = doc[page_num]
+        if workers > 1:
+            pages = self._scan_chunks(
+                text_patterns, case_sensitive, use_regex, whole_words_only,
+                page_order, regex_set, stats, with_text
+            )
+        else:
+            # Only a serial scan of every page can write a complete index
+            self._open_text_index(len(doc), build=len(page_order) == len(doc))
+            pages = self._scan_pages(doc, page_order, regex_set, literal_matcher, stats, with_text)
+        
+        try:
+            for page_num, page, page_matches in pages:
+                page_pbar.update(1)
+                for index, count in enumerate(page_matches.counts()):
+                    if count:
+                        pages_hit[index] += 1
+                        hits[index] += count
+                
+                page_found = len(page_matches)
+                if page_found:
+                    found += page_found
+                    page_pbar.set_postfix({
+                        'page': f"{page_num + 1}/{len(doc)}",
+                        'found': found
+                    })
+                
+                yield page_num, page if page is not None else doc[page_num], page_matches
             
-            if use_regex:
-                page_instances = self._find_regex_instances(
-                    page, pattern, case_sensitive, whole_words_only
-                )
+            if self._index_writer is not None:
+                try:
+                    if self._index_writer.commit():
+                        self.logger.info(f"Text index written: {self.text_index_path}")
+                except OSError as e:
+                    self._abandon_text_index(e)
+            
+            self._record_pattern_stats(
+                regex_set, literal_matcher,
+                Counter({index: stats.pages_total - stats.pages_ruled_out for index in range(len(text_patterns))}),
+                pages_hit, hits
+            )
+        finally:
+            pages.close()
+            self._close_text_index()
+            page_pbar.close()
+        
+        if workers == 1:
+            stats.wall_seconds = stats.scan_seconds
+        
+        for pattern, skipped in stats.pages_skipped.items():
+            self.logger.info(f"Plain text ruled out {skipped}/{stats.pages_total} page(s) for '{pattern}'")
+        self.logger.debug(f"Character geometry extracted for {stats.pages_extracted} page(s)")
+        if workers > 1:
+            self.logger.info(
+                f"Scanned {stats.pages_total} page(s) with {workers} workers in {stats.wall_seconds:.1f}s "
+                f"({stats.scan_seconds:.1f}s of scanning, speedup {stats.speedup:.1f}x)"
+            )
+        
+        if self.text_cache is not None:
+            self.logger.debug(
+                f"Page text cache: {self.text_cache.hits} hits, {self.text_cache.misses} misses, "
+                f"{self.text_cache.current_bytes / MB_DIVISOR:.1f} MB in use"
+            )
+    
+    def _scan_pages(
+        self,
+        doc: pymupdf.Document,
+        page_order: List[int],
+        regex_set: Optional[RegexPatternSet],
+        literal_matcher: Optional[TextMatcher],
+        stats: ScanStats,
+        with_text: bool = False
+    ) -> Iterator[Tuple[int, pymupdf.Page, MatchStore]]:
+        """
+        Scan pages one after another in this process.
+        
+        Yields:
+            Tuples of (page number, page, MatchStore of the page's matches)
+        """
+        patterns = regex_set.patterns if regex_set is not None else literal_matcher.patterns
+        required = self._required_literals(regex_set, literal_matcher)
+        
+        for page_num in page_order:
+            started = time.perf_counter()
+            page = doc[page_num]
+            if self._index_rules_out(page_num, required):
+                # The index's trigram filter rules out every pattern
+                stats.pages_ruled_out += 1
+                for pattern in stats.pages_skipped:
+                    stats.pages_skipped[pattern] += 1
+                page_matches = MatchStore(patterns)
             else:
-                page_instances = self._find_text_instances(
-                    page, pattern, case_sensitive, whole_words_only, search_flags
+                page_matches = self._scan_page(
+                    page, page_num, regex_set, literal_matcher, stats, with_text
                 )
+            stats.scan_seconds += time.perf_counter() - started
             
-            if page_instances:
-                self.logger.debug(f"  Found on page {page_num + 1}: {len(page_instances)} instance(s)")
-                pattern_count += len(page_instances)
-                
-                for instance in page_instances:
-                    page.add_redact_annot(instance)
+            yield page_num, page, page_matches
+    
+    def _scan_chunks(
+        self,
+        text_patterns: List[str],
+        case_sensitive: bool,
+        use_regex: bool,
+        whole_words_only: bool,
+        page_order: List[int],
+        regex_set: Optional[RegexPatternSet],
+        stats: ScanStats,
+        with_text: bool = False
+    ) -> Iterator[Tuple[int, Optional[pymupdf.Page], MatchStore]]:
+        """
+        Scan chunks of consecutive pages in a pool of worker processes.
+        
+        Each worker opens the document and any current text index once and
+        builds the same matchers, in the same pattern order, as this process.
+        Chunks are collected in order as soon as each is done, so pages come
+        out in the same order as from a serial scan and callers can act on
+        the first pages while later ones are scanned. Only a few chunks per
+        worker are in flight at a time, which bounds the matches held.
+        
+        A parallel scan never writes a text index, and since the workers are
+        separate processes it neither reads nor fills the page text cache.
+        
+        Yields:
+            Tuples of (page number, None for the page, MatchStore of the
+            page's matches)
+        """
+        workers = stats.workers
+        chunk_size = max(1, min(PARALLEL_CHUNK_PAGES, len(page_order) // workers))
+        chunks = iter([
+            page_order[start:start + chunk_size] for start in range(0, len(page_order), chunk_size)
+        ])
+        if self.text_cache is not None:
+            self.logger.debug("Page text cache is not used by parallel scans")
+        
+        options = {
+            "join_blocks": self.join_blocks,
+            "text_index": self.text_index_path,
+            "ignore_accents": self.ignore_accents,
+            "digit_projection": self.digit_projection,
+            # Edit distance only applies to literals, and this process has
+            # already warned about it once for regexes
+            "max_edits": 0 if use_regex else self.max_edits
+        }
+        file_hash = self._input_hash() if self.text_index_path is not None else None
+        order = regex_set.order if regex_set is not None else None
+        timed = regex_set is not None and regex_set.seconds is not None
+        
+        # Wall clock time, which unlike a performance counter is shared by the workers
+        started = time.time()
+        finished = started
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_scan_worker,
+            initargs=(
+                self.input_file, options, file_hash, text_patterns,
+                case_sensitive, use_regex, whole_words_only, order, timed
+            )
+        )
+        try:
+            pending = deque(
+                pool.submit(_scan_chunk, chunk, with_text)
+                for chunk in islice(chunks, workers * PARALLEL_TASKS_PER_WORKER)
+            )
+            while pending:
+                chunk_pages, chunk_stats, seconds, chunk_finished = pending.popleft().result()
+                for chunk in islice(chunks, 1):
+                    pending.append(pool.submit(_scan_chunk, chunk, with_text))
                 
-                page.apply_redactions()
+                finished = max(finished, chunk_finished)
+                stats.pages_extracted += chunk_stats.pages_extracted
+                stats.pages_ruled_out += chunk_stats.pages_ruled_out
+                stats.scan_seconds += chunk_stats.scan_seconds
+                for pattern, skipped in chunk_stats.pages_skipped.items():
+                    stats.pages_skipped[pattern] += skipped
+                if seconds is not None:
+                    for index, elapsed in enumerate(seconds):
+                        regex_set.seconds[index] += elapsed
                 
-                # Update progress bar with current findings
-                page_pbar.set_postfix({
-                    'page': f"{page_num + 1}/{len(doc)}",
-                    'found': pattern_count
-                })
+                for page_num, page_matches in chunk_pages:
+                    yield page_num, None, page_matches
+            
+            stats.wall_seconds = finished - started
+        finally:
+            pool.shutdown(cancel_futures=True)
+    
+    def _input_hash(self) -> bytes:
+        """SHA-256 of the input file, hashed once per redactor."""
+        if self._file_hash is None:
+            self._file_hash = file_sha256(self.input_file)
+        return self._file_hash
+    
+    def _selected_pages(self, page_count: int) -> List[int]:
+        """Indices of the pages to scan in a document of the given length."""
+        if self.pages is None:
+            return list(range(page_count))
+        
+        try:
+            selected = parse_page_ranges(self.pages, page_count)
+        except ValueError as e:
+            raise RedactionError(f"Invalid page selection '{self.pages}': {e}")
         
-        page_pbar.close()
-        return pattern_count
+        self.logger.info(f"Scanning {len(selected)} of {page_count} page(s): {self.pages}")
+        return selected
     
-    def _find_text_instances(
-        self, 
-        page, 
-        pattern: str, 
-        case_sensitive: bool, 
+    def _build_matchers(
+        self,
+        text_patterns: List[str],
+        case_sensitive: bool,
+        use_regex: bool,
         whole_words_only: bool,
-        search_flags: int
-    ) -> List:
-        """Find text instances using PyMuPDF's search."""
-        if case_sensitive:
-            instances = page.search_for(pattern, flags=search_flags)
+        order: Optional[List[int]] = None,
+        timed: Optional[bool] = None
+    ) -> Tuple[Optional[RegexPatternSet], Optional[TextMatcher]]:
+        """
+        Compile the patterns once for a whole run.
+        
+        With pattern statistics, regexes are scanned cheapest way to a hit
+        first, and timed for the statistics of the run. Workers pass the
+        order and timing of the process they scan for instead.
+        
+        Returns:
+            Tuple of (regex pattern set, literal matcher), one of them None
+        """
+        if use_regex:
+            if self.max_edits:
+                self.logger.warning("Edit distance only applies to literal patterns; regexes match exactly")
+            if order is None and self.pattern_stats is not None:
+                order = self.pattern_stats.order("regex", text_patterns)
+                self.logger.debug(f"Pattern order from statistics: {[text_patterns[index] for index in order]}")
+            if timed is None:
+                timed = self.pattern_stats is not None
+            return RegexPatternSet(
+                text_patterns, case_sensitive, whole_words_only,
+                self.ignore_accents, self.digit_projection,
+                order=order, timed=timed
+            ), None
+        
+        # Plain literals are located with MuPDF's search, which ignores case,
+        # so every literal does: an option that widens matching must not
+        # lose the hits search finds
+        if self.max_edits:
+            return None, FuzzyMatcher(
+                text_patterns, self.max_edits, False, whole_words_only, self.ignore_accents
+            )
+        if not self.ignore_accents:
+            # Search also matches across whitespace and line breaks
+            return None, SearchMatcher(text_patterns, whole_words_only)
+        return None, LiteralMatcher(
+            text_patterns, False, whole_words_only, self.ignore_accents
+        )
+    
+    def _record_pattern_stats(
+        self,
+        regex_set: Optional[RegexPatternSet],
+        literal_matcher: Optional[TextMatcher],
+        pages: Counter,
+        pages_hit: Counter,
+        hits: Counter
+    ) -> None:
+        """Add a run's pages, hits and matching time per pattern to the saved statistics."""
+        if self.pattern_stats is None:
+            return
+        
+        if regex_set is not None:
+            kind, patterns, seconds = "regex", regex_set.patterns, regex_set.seconds
         else:
-            # For case-insensitive search, we need to get all text and search manually
-            instances = self._case_insensitive_search(page, pattern, search_flags)
+            kind = "fuzzy" if isinstance(literal_matcher, FuzzyMatcher) else "literal"
+            patterns, seconds = literal_matcher.patterns, None
         
-        if whole_words_only:
-            instances = self._filter_whole_words(page, instances, pattern)
+        for index, pattern in enumerate(patterns):
+            self.pattern_stats.record(
+                kind, pattern, pages[index], pages_hit[index], hits[index],
+                seconds[index] if seconds else 0.0
+            )
         
-        return instances
+        try:
+            self.pattern_stats.save()
+        except OSError as e:
+            self.logger.warning(f"Cannot write pattern statistics {self.pattern_stats.path}: {e}")
+    
+    def _index_rules_out(self, page_num: int, required: List[Optional[FrozenSet[str]]]) -> bool:
+        """Whether the text index's trigram filter shows that no pattern can match a page."""
+        if self._text_index is None:
+            return False
+        return not any(
+            literals is None or self._text_index.may_contain(page_num, literals)
+            for literals in required
+        )
+    
+    def _index_suggests(self, page_num: int, required: List[Optional[FrozenSet[str]]]) -> bool:
+        """Whether the text index's trigram filter holds every literal some pattern needs on a page."""
+        if self._text_index is None:
+            return False
+        return any(
+            literals and self._text_index.may_contain(page_num, literals)
+            for literals in required
+        )
     
-    def _case_insensitive_search(self, page, pattern: str, search_flags: int) -> List:
-        """Perform case-insensitive text search."""
-        # Get all text blocks from the page
-        text_blocks = page.get_text("dict")
-        instances = []
+    def _open_text_index(self, page_count: int, build: bool = True) -> None:
+        """Open a current text index for this run, or start writing a new one."""
+        if self.text_index_path is None:
+            return
         
-        # Search in each text block
-        pattern_lower = pattern.lower()
+        file_hash = self._input_hash()
+        index = TextIndex.open(self.text_index_path, file_hash, TEXTPAGE_FLAGS, self.join_blocks)
+        if index is not None and index.page_count == page_count:
+            self.logger.info(f"Using text index: {self.text_index_path}")
+            self._text_index = index
+            return
         
-        for block in text_blocks.get("blocks", []):
-            if "lines" not in block:
-                continue
+        if index is not None:
+            index.close()
+        if not build:
+            return
+        self.logger.info(f"Building text index: {self.text_index_path}")
+        try:
+            self._index_writer = TextIndexWriter(
+                self.text_index_path, file_hash, TEXTPAGE_FLAGS, self.join_blocks, page_count
+            )
+        except OSError as e:
+            self.logger.warning(f"Cannot write text index {self.text_index_path}: {e}")
+    
+    def _abandon_text_index(self, error: OSError) -> None:
+        """Stop writing the text index after a write failed; the run goes on without it."""
+        self.logger.warning(f"Cannot write text index {self.text_index_path}: {error}")
+        try:
+            self._index_writer.abort()
+        except OSError:
+            pass
+        self._index_writer = None
+    
+    def _close_text_index(self) -> None:
+        """Release the text index of the run, discarding an unfinished one."""
+        if self._text_index is not None:
+            self._text_index.close()
+            self._text_index = None
+        if self._index_writer is not None:
+            self._index_writer.abort()
+            self._index_writer = None
+    
+    def _required_literals(
+        self,
+        regex_set: Optional[RegexPatternSet] = None,
+        literal_matcher: Optional[TextMatcher] = None
+    ) -> List[Optional[FrozenSet[str]]]:
+        """Literals each pattern needs on a page, or None where nothing is known."""
+        if self.ignore_accents or isinstance(literal_matcher, FuzzyMatcher):
+            # The index's trigrams keep their accents and only match exactly,
+            # so they cannot rule out accent-insensitive or fuzzy matches
+            patterns = regex_set.patterns if regex_set is not None else literal_matcher.patterns
+            return [None] * len(patterns)
+        if isinstance(literal_matcher, SearchMatcher):
+            # Search lets any whitespace separate the words of a literal
+            return [frozenset(pattern.split()) for pattern in literal_matcher.patterns]
+        if literal_matcher is not None:
+            return [frozenset([pattern]) for pattern in literal_matcher.patterns]
+        return [
+            requirement[0] if requirement is not None else None
+            for requirement in regex_set.prefilter.requirements
+        ]
+    
+    def _scan_page(
+        self,
+        page: pymupdf.Page,
+        page_num: int,
+        regex_set: Optional[RegexPatternSet] = None,
+        literal_matcher: Optional[TextMatcher] = None,
+        stats: Optional[ScanStats] = None,
+        with_text: bool = False
+    ) -> MatchStore:
+        """
+        Run every pattern against a single page, extracting its text at most once.
+        
+        The patterns are first matched against the page's plain text. Only
+        pages with hits go on to the structured extraction, and only the
+        lines with hits are indexed and matched again to locate them.
+        """
+        patterns = regex_set.patterns if regex_set is not None else literal_matcher.patterns
+        
+        page_text, textpage = self._load_page_text(page, page_num, with_geometry=False)
+        if self._index_writer is not None:
+            # The index needs every page in full, hits or not
+            page_text, textpage = self._load_page_text(page, page_num, True, page_text, textpage)
+            try:
+                self._index_writer.add(page_text)
+            except OSError as e:
+                self._abandon_text_index(e)
+        
+        hit_counts, hit_lines = self._match_plain_text(page_text, regex_set, literal_matcher)
+        
+        if stats is not None:
+            for index, pattern in enumerate(patterns):
+                if index not in hit_counts:
+                    stats.pages_skipped[pattern] += 1
+        
+        if not hit_counts:
+            return MatchStore(patterns)
+        
+        if isinstance(literal_matcher, SearchMatcher):
+            return self._search_instances(
+                page, page_num, page_text, textpage, literal_matcher, set(hit_counts), with_text
+            )
+        
+        if stats is not None:
+            stats.pages_extracted += 1
+        page_text, _ = self._load_page_text(page, page_num, True, page_text, textpage, hit_lines)
+        
+        if regex_set is not None:
+            return self._find_regex_instances(page_text, regex_set, set(hit_counts), page_num, with_text)
+        return self._find_text_instances(page_text, literal_matcher, page_num, with_text)
+    
+    def _match_plain_text(
+        self,
+        page_text: PageText,
+        regex_set: Optional[RegexPatternSet] = None,
+        literal_matcher: Optional[TextMatcher] = None,
+        only: Optional[Set[int]] = None,
+        first_only: bool = False,
+        tried: Optional[Set[int]] = None
+    ) -> Tuple[Counter, Optional[Set[str]]]:
+        """
+        Match the patterns against a page's plain text, without any geometry.
+        
+        Args:
+            page_text: Page text, with or without geometry
+            regex_set: Regex patterns, if matching regexes
+            literal_matcher: Literal matcher, if matching literals
+            only: Indices of the patterns to match, or None for all of them
+            first_only: Stop at the first hit, leaving the patterns after it unscanned
+            tried: Set to add the indices of the patterns the page was
+                matched against to: those run on it, and those the
+                prefilter ruled out
+        
+        Whole blocks can only be told apart once the page's geometry is
+        built. Without it, regexes are only prefiltered: joining the page
+        into one unit would change what their anchors and lookarounds match.
+        
+        Returns:
+            Tuple of ({pattern index: hits} for the patterns with hits, or
+            with possible hits when regexes are only prefiltered, texts of the
+            lines with hits, or None when whole blocks are matched)
+        """
+        units = self._plain_units(page_text)
+        patterns = regex_set.patterns if regex_set is not None else literal_matcher.patterns
+        requested = set(only) if only is not None else set(range(len(patterns)))
+        if tried is None:
+            tried = set()
+        
+        # Projections keep line breaks, so projected units pair up with the originals
+        candidates = None
+        folded = True
+        if isinstance(literal_matcher, SearchMatcher):
+            # Search runs across line breaks, so the whole page is one unit,
+            # folded by the matcher itself
+            units = scanned = [page_text.text]
+            folded = False
+        elif regex_set is not None:
+            scanned = self._plain_units(page_text, strip_accents=self.ignore_accents)
+            
+            # Rule out patterns missing a required literal or character class
+            # before running any of them
+            folded_text = None
+            if not regex_set.prefilter.case_sensitive:
+                folded_text = " ".join(self._plain_units(page_text, True, self.ignore_accents))
+            candidates = regex_set.prefilter.candidates(" ".join(scanned), folded_text)
+            if only is not None:
+                candidates &= only
+            tried.update(requested - candidates)
+            if not candidates:
+                return Counter(), set()
+            if not first_only:
+                tried.update(candidates)
+            if self.join_blocks and not page_text.has_geometry:
+                return Counter(candidates), None
+        else:
+            scanned = self._plain_units(page_text, not literal_matcher.case_sensitive, self.ignore_accents)
+        if regex_set is None:
+            # The automaton runs every literal at once
+            tried.update(requested)
+        
+        hit_counts = Counter()
+        hit_lines = set()
+        for unit, scanned_unit in zip(units, scanned):
+            if regex_set is not None:
+                matches = regex_set.finditer(scanned_unit, candidates)
+            else:
+                matches = (
+                    match for match in literal_matcher.finditer(scanned_unit, folded=folded)
+                    if only is None or match[0] in only
+                )
+            
+            if first_only:
+                match = next(matches, None)
+                hits = [match[0]] if match is not None else []
+                if regex_set is not None:
+                    # Members run in order, so those after a hit were never tried
+                    ran = regex_set.order[:regex_set.order.index(match[0]) + 1] if hits else regex_set.order
+                    tried.update(index for index in ran if index in candidates)
+            else:
+                hits = [index for index, _, _ in matches]
             
-            for line in block["lines"]:
-                for span in line.get("spans", []):
-                    text = span.get("text", "")
-                    text_lower = text.lower()
-                    
-                    # Find all occurrences in this span
-                    start = 0
-                    while True:
-                        pos = text_lower.find(pattern_lower, start)
-                        if pos == -1:
-                            break
-                        
-                        # Calculate the bbox for this occurrence
-                        bbox = span["bbox"]
-                        char_width = (bbox[2] - bbox[0]) / len(text) if text else 0
-                        
-                        # Estimate position within the span
-                        start_x = bbox[0] + pos * char_width
-                        end_x = bbox[0] + (pos + len(pattern)) * char_width
-                        
-                        instances.append((start_x, bbox[1], end_x, bbox[3]))
-                        start = pos + 1
-        
-        return instances
+            if hits:
+                hit_counts.update(hits)
+                hit_lines.add(unit)
+                if first_only:
+                    break
+        
+        return hit_counts, None if self.join_blocks or not folded else hit_lines
     
-    def _find_regex_instances(
-        self, 
-        page, 
-        pattern: str, 
-        case_sensitive: bool, 
-        whole_words_only: bool
-    ) -> List:
-        """Find regex pattern instances in the page."""
-        # Compile regex pattern
-        flags = 0 if case_sensitive else re.IGNORECASE
-        if whole_words_only:
-            pattern = r'\b' + pattern + r'\b'
+    def _plain_units(self, page_text: PageText, casefold: bool = False, strip_accents: bool = False) -> List[str]:
+        """Split a page's projected plain text into the units matches can span: lines, or blocks."""
+        if self.join_blocks:
+            if page_text.has_geometry:
+                return [text for _, text, _ in page_text.projected_units(casefold, strip_accents)]
+            # Lines of a block are joined by spaces in the match units; matching
+            # the whole page that way finds every literal a block could contain
+            return [page_text.projected_text(casefold, strip_accents).replace("\n", " ")]
+        return page_text.projected_text(casefold, strip_accents).split("\n")
+    
+    def _load_page_text(
+        self,
+        page: pymupdf.Page,
+        page_num: int,
+        with_geometry: bool,
+        page_text: Optional[PageText] = None,
+        textpage: Optional[pymupdf.TextPage] = None,
+        lines: Optional[Set[str]] = None
+    ) -> Tuple[PageText, Optional[pymupdf.TextPage]]:
+        """
+        Get a page's extracted text, from the page text cache when possible.
         
-        try:
-            compiled_pattern = re.compile(pattern, flags)
-        except re.error as e:
-            self.logger.error(f"Invalid regex pattern '{pattern}': {e}")
-            return []
+        Passing back the results of an earlier call adds the character
+        geometry to page text that was loaded without it. With ``lines``,
+        the geometry only has to cover the lines with those texts.
+        
+        Returns:
+            Tuple of (page text, TextPage it was extracted from, or None when
+            everything needed came from the cache or the text index)
+        """
+        if self._text_index is not None:
+            return self._text_index.page_text(page_num), None
+        
+        content_hash = None
+        if page_text is None and self.text_cache is not None:
+            content_hash = page_content_hash(page)
+            page_text = self.text_cache.get(page_num, content_hash)
+        
+        if page_text is not None and (not with_geometry or page_text.covers(lines)):
+            return page_text, textpage
+        
+        # MuPDF builds its text page once here; every extraction of this page
+        # reuses it, and it is released as soon as the page is done
+        if textpage is None:
+            textpage = page.get_textpage(flags=TEXTPAGE_FLAGS)
+        
+        if page_text is None:
+            page_text = PageText.from_textpage(textpage, False, content_hash, self.join_blocks)
+        
+        if with_geometry:
+            # Keep the lines an earlier pass indexed, so the cached geometry
+            # stays useful to it as well
+            if lines is not None and page_text.geometry_lines is not None:
+                lines = lines | page_text.geometry_lines
+            page_text.add_geometry(textpage, lines)
         
-        # Get text with position information
-        text_blocks = page.get_text("dict")
-        instances = []
+        if self.text_cache is not None:
+            self.text_cache.put(page_num, page_text.content_hash, page_text)
         
-        for block in text_blocks.get("blocks", []):
-            if "lines" not in block:
+        return page_text, textpage
+    
+    def _find_text_instances(
+        self,
+        page_text: PageText,
+        literal_matcher: TextMatcher,
+        page_num: int = 0,
+        with_text: bool = False
+    ) -> MatchStore:
+        """
+        Find the instances of every literal in one pass over each line.
+        
+        Case- and accent-insensitive literals are matched against the page's
+        projected units, projected once per page whatever the number of
+        patterns, and their offsets are mapped back to the original characters.
+        """
+        units = page_text.projected_units(not literal_matcher.case_sensitive, self.ignore_accents)
+        matches = (
+            (index, unit_start, text_offsets, start_pos, end_pos)
+            for unit_start, text, text_offsets in units
+            for index, start_pos, end_pos in literal_matcher.finditer(text, folded=True)
+        )
+        return self._collect_matches(page_text, page_num, literal_matcher.patterns, matches, with_text)
+    
+    def _search_instances(
+        self,
+        page: pymupdf.Page,
+        page_num: int,
+        page_text: PageText,
+        textpage: Optional[pymupdf.TextPage],
+        literal_matcher: SearchMatcher,
+        candidates: Set[int],
+        with_text: bool = False
+    ) -> MatchStore:
+        """
+        Locate the literals found on a page with MuPDF's own search.
+        
+        Only the literals the matcher found in the plain text are searched
+        for, and every box search_for returns, one per line a hit covers,
+        is kept as is. The character geometry is only built to check whole
+        words or to keep the matched text.
+        """
+        needs_chars = literal_matcher.whole_words_only or with_text
+        if needs_chars:
+            page_text, textpage = self._load_page_text(page, page_num, True, page_text, textpage)
+        if textpage is None:
+            # The page text came from the cache or the index; search needs
+            # MuPDF's own text page
+            textpage = page.get_textpage(flags=TEXTPAGE_FLAGS)
+        
+        hits = [
+            (index, tuple(rect))
+            for index in sorted(candidates)
+            for rect in page.search_for(literal_matcher.patterns[index], textpage=textpage)
+        ]
+        spans = page_text.spans_within([rect for _, rect in hits]) if needs_chars else [(0, 0)] * len(hits)
+        
+        store = MatchStore(literal_matcher.patterns, keep_text=with_text)
+        for (index, rect), (start_pos, end_pos) in sorted(
+            zip(hits, spans), key=lambda hit: hit[1] if needs_chars else 0
+        ):
+            if literal_matcher.whole_words_only and not literal_matcher.is_whole_word(
+                page_text.chars, start_pos, end_pos
+            ):
                 continue
-                
-            for line in block["lines"]:
-                for span in line.get("spans", []):
-                    text = span.get("text", "")
-                    bbox = span["bbox"]
-                    
-                    # Find all matches in this span
-                    for match in compiled_pattern.finditer(text):
-                        start_pos, end_pos = match.span()
-                        
-                        # Calculate bbox for the match
-                        char_width = (bbox[2] - bbox[0]) / len(text) if text else 0
-                        start_x = bbox[0] + start_pos * char_width
-                        end_x = bbox[0] + end_pos * char_width
-                        
-                        instances.append((start_x, bbox[1], end_x, bbox[3]))
-        
-        return instances
-    
-    def _filter_whole_words(self, page, instances: List, pattern: str) -> List:
-        """Filter instances to only include whole word matches."""
-        # This is a simplified implementation
-        # In a production system, you'd want to examine the surrounding characters
-        filtered_instances = []
-        
-        for instance in instances:
-            # For now, just return all instances
-            # TODO: Implement proper word boundary checking
-            filtered_instances.append(instance)
-        
-        return filtered_instances
+            store.add(index, page_num, [rect], page_text.chars[start_pos:end_pos] if with_text else None)
+        
+        return store
+    
+    def _find_regex_instances(
+        self,
+        page_text: PageText,
+        regex_set: RegexPatternSet,
+        candidates: Optional[Set[int]] = None,
+        page_num: int = 0,
+        with_text: bool = False
+    ) -> MatchStore:
+        """Find instances of every candidate regex in the pattern set, running the set once per line."""
+        matches = (
+            (index, unit_start, text_offsets, start_pos, end_pos)
+            for unit_start, text, text_offsets in page_text.projected_units(False, self.ignore_accents)
+            for index, start_pos, end_pos in regex_set.finditer(text, candidates)
+        )
+        return self._collect_matches(page_text, page_num, regex_set.patterns, matches, with_text)
+    
+    @staticmethod
+    def _collect_matches(
+        page_text: PageText,
+        page_num: int,
+        patterns: List[str],
+        matches: Iterator[Tuple[int, int, Optional[Sequence[int]], int, int]],
+        with_text: bool
+    ) -> MatchStore:
+        """
+        Box the matches found in a page's projected units into a store.
+        
+        Args:
+            matches: Tuples of (pattern index, unit start, unit offsets, start
+                offset, end offset), with offsets into the projected unit
+            with_text: Keep the matched text of each match
+        """
+        store = MatchStore(patterns, keep_text=with_text)
+        
+        for index, unit_start, offsets, start_pos, end_pos in matches:
+            start_pos, end_pos = original_span(offsets, start_pos, end_pos)
+            start_pos += unit_start
+            end_pos += unit_start
+            store.add(
+                index, page_num, page_text.bboxes(start_pos, end_pos),
+                page_text.chars[start_pos:end_pos] if with_text else None
+            )
+        
+        return store
     
     def _save_and_optimize(self, doc: pymupdf.Document) -> None:
         """Save the document and optimize with qpdf."""
@@ -355,88 +1079,325 @@ class PDFRedactor:
         """
         Preview what would be redacted without making changes.
         
+        Where hits were found is kept in a bit-packed pattern-by-page
+        ``HitMatrix``; pages are reported both as lists and as ranges such as
+        "1-40, 90-120".
+        
         Returns:
-            Dictionary with pattern counts and page information
+            Dictionary with the total instances, each pattern's count, pages
+            and page ranges, the pages and page ranges affected and the hit
+            matrix
         """
         self.logger.info(f"Previewing redactions for: {self.input_file}")
+        doc = self._open_document()
         
         try:
-            doc = pymupdf.open(str(self.input_file))
-        except Exception as e:
-            raise RedactionError(f"Failed to open PDF: {e}")
+            matrix = HitMatrix(text_patterns, len(doc))
+            for page_num, _page, page_matches in self._scan_document(
+                doc, text_patterns, case_sensitive, use_regex, whole_words_only,
+                desc="Previewing pages"
+            ):
+                for pattern, count in page_matches.count_by_pattern().items():
+                    if count:
+                        matrix.add(pattern, page_num, count)
         
-        preview_results = {
-            "total_instances": 0,
-            "patterns": {},
-            "pages_affected": set()
+        finally:
+            doc.close()
+        
+        return {
+            "total_instances": matrix.total_instances,
+            "patterns": {
+                pattern: {
+                    "count": matrix.count(pattern),
+                    "pages": matrix.pages(pattern),
+                    "page_ranges": matrix.page_ranges(pattern)
+                }
+                for pattern in matrix.patterns
+            },
+            "pages_affected": matrix.pages(),
+            "page_ranges_affected": matrix.page_ranges(),
+            "hit_matrix": matrix
         }
+    
+    def iter_matches(
+        self,
+        text_patterns: List[str],
+        case_sensitive: bool = True,
+        use_regex: bool = False,
+        whole_words_only: bool = False
+    ) -> Iterator[MatchRecord]:
+        """
+        Stream the matches of every pattern page by page, without making changes.
+        
+        Records of a page are yielded as soon as the page is scanned, and
+        nothing is kept once a page is done, so memory does not grow with the
+        number of hits. Closing the generator early stops the scan and
+        releases the document.
+        
+        Yields:
+            A MatchRecord per match, in page order
+        """
+        self.logger.info(f"Streaming matches for: {self.input_file}")
+        doc = self._open_document()
+        
+        try:
+            for _page_num, _page, page_matches in self._scan_document(
+                doc, text_patterns, case_sensitive, use_regex, whole_words_only,
+                desc="Matching pages", with_text=True
+            ):
+                yield from page_matches
+        
+        finally:
+            doc.close()
+    
+    def estimate_redactions(
+        self,
+        text_patterns: List[str],
+        case_sensitive: bool = True,
+        use_regex: bool = False,
+        whole_words_only: bool = False,
+        sample_size: Optional[int] = None,
+        sample_fraction: Optional[float] = None,
+        seed: int = 0
+    ) -> dict:
+        """
+        Estimate what a full preview would find from a sample of pages.
+        
+        The sample takes one random page from each of equal runs of
+        consecutive pages, drawn from the page selection with a fixed seed
+        so the same run always scans the same pages. Hit counts and the
+        fraction of affected pages are extrapolated per pattern with 95%
+        intervals; a sample covering every page reports exact figures.
+        
+        Args:
+            sample_size: Number of pages to sample
+            sample_fraction: Share of the pages to sample, if no size is given
+            seed: Seed of the page sample
+        
+        Returns:
+            Dictionary with the sampled pages and the estimates per pattern
+        """
+        if sample_size is None and sample_fraction is None:
+            raise ValueError("Either sample_size or sample_fraction is required")
+        if sample_size is not None and sample_size < 1:
+            raise ValueError("sample_size must be positive")
+        if sample_size is None and not 0 < sample_fraction <= 1:
+            raise ValueError("sample_fraction must be in (0, 1]")
+        
+        self.logger.info(f"Estimating redactions for: {self.input_file}")
+        doc = self._open_document()
+        page_counts = {pattern: [] for pattern in text_patterns}
+        
+        try:
+            selected = self._selected_pages(len(doc))
+            if sample_size is None:
+                sample_size = max(1, math.ceil(sample_fraction * len(selected)))
+            sample = stratified_sample(selected, sample_size, seed)
+            
+            for _page_num, _page, page_matches in self._scan_document(
+                doc, text_patterns, case_sensitive, use_regex, whole_words_only,
+                desc="Sampling pages", page_order=sample
+            ):
+                for pattern, count in page_matches.count_by_pattern().items():
+                    page_counts[pattern].append(count)
+        
+        finally:
+            doc.close()
+        
+        population = len(selected)
+        estimates = {}
+        for pattern, counts in page_counts.items():
+            pages_hit = sum(1 for count in counts if count)
+            estimated_count, count_interval = total_interval(counts, population)
+            page_fraction = pages_hit / len(counts) if counts else 0.0
+            if len(counts) >= population:
+                fraction_interval = (page_fraction, page_fraction)
+            else:
+                fraction_interval = wilson_interval(pages_hit, len(counts))
+            
+            estimates[pattern] = {
+                "sample_count": sum(counts),
+                "sample_pages_hit": pages_hit,
+                "estimated_count": estimated_count,
+                "count_interval": count_interval,
+                "page_fraction": page_fraction,
+                "page_fraction_interval": fraction_interval
+            }
+        
+        return {
+            "pages_total": population,
+            "pages_sampled": len(sample),
+            "sample_pages": [page_num + 1 for page_num in sample],
+            "seed": seed,
+            "confidence": CONFIDENCE,
+            "patterns": estimates
+        }
+    
+    def triage(
+        self,
+        text_patterns: List[str],
+        case_sensitive: bool = True,
+        use_regex: bool = False,
+        whole_words_only: bool = False,
+        hits_per_pattern: Optional[int] = None
+    ) -> dict:
+        """
+        Screen the document for matches, stopping as soon as the answer is known.
+        
+        Only the plain text is matched, so no character geometry is built
+        unless whole blocks are matched: only the structured text shows where
+        one block ends and the next begins. By default the scan stops at the first hit found, trying the
+        patterns in the order the pattern statistics suggest, if kept.
+        With ``hits_per_pattern``, a pattern is no longer searched once it
+        has that many hits, and the scan stops when every pattern has. Pages
+        the text index rules out for every pattern are never loaded, and the
+        pages its trigram filter shows a pattern's literals on are scanned
+        before the others, so the first hit is the first found rather than
+        the first in the document. Without a text index, pages are scanned in
+        document order.
+        
+        Returns:
+            Dictionary with whether anything matched, the pattern and page of
+            the first hit, the hits found per pattern and the pages scanned
+        """
+        self.logger.info(f"Triaging: {self.input_file}")
+        doc = self._open_document()
+        page_count = len(doc)
+        text_patterns = list(dict.fromkeys(text_patterns))
+        
+        regex_set, literal_matcher = self._build_matchers(
+            text_patterns, case_sensitive, use_regex, whole_words_only
+        )
+        pattern_counts = {pattern: 0 for pattern in text_patterns}
+        pattern_pages = {pattern: set() for pattern in text_patterns}
+        pending = set(range(len(text_patterns)))
+        first_hit = None
+        pages_scanned = 0
+        pattern_scans = Counter()
+        pattern_hit_pages = Counter()
+        pattern_hits = Counter()
         
         try:
-            # Create overall progress bar for patterns
-            pattern_pbar = tqdm(
-                text_patterns, 
-                desc="Previewing patterns", 
+            self._open_text_index(page_count, build=False)
+            required = self._required_literals(regex_set, literal_matcher)
+            selected = self._selected_pages(page_count)
+            page_order = [
+                page_num for page_num in selected
+                if not self._index_rules_out(page_num, required)
+            ]
+            # Pages holding a pattern's literals come first; the rest are kept
+            # only because some pattern has no literal to look for
+            page_order.sort(key=lambda page_num: not self._index_suggests(page_num, required))
+            
+            page_pbar = tqdm(
+                page_order,
+                desc="Triaging pages",
                 disable=not self.show_progress,
-                unit="pattern"
+                unit="page"
             )
             
-            for pattern in pattern_pbar:
-                pattern_count = 0
-                pattern_pages = set()
-                
-                pattern_pbar.set_description(f"Previewing: '{pattern[:20]}{'...' if len(pattern) > 20 else ''}'")
-                
-                # Create progress bar for pages
-                page_pbar = tqdm(
-                    range(len(doc)), 
-                    desc=f"Scanning pages",
-                    disable=not self.show_progress,
-                    unit="page",
-                    leave=False
+            for page_num in page_pbar:
+                pages_scanned += 1
+                page_text, _ = self._load_page_text(doc[page_num], page_num, with_geometry=self.join_blocks)
+                tried = set()
+                hit_counts, _ = self._match_plain_text(
+                    page_text, regex_set, literal_matcher, pending,
+                    first_only=hits_per_pattern is None, tried=tried
                 )
                 
-                for page_num in page_pbar:
-                    page = doc[page_num]
-                    
-                    if use_regex:
-                        page_instances = self._find_regex_instances(
-                            page, pattern, case_sensitive, whole_words_only
-                        )
-                    else:
-                        search_flags = pymupdf.TEXT_DEHYPHENATE
-                        page_instances = self._find_text_instances(
-                            page, pattern, case_sensitive, whole_words_only, search_flags
-                        )
-                    
-                    if page_instances:
-                        page_count = len(page_instances)
-                        pattern_count += page_count
-                        pattern_pages.add(page_num + 1)
-                        preview_results["pages_affected"].add(page_num + 1)
-                        
-                        # Update page progress bar
-                        page_pbar.set_postfix({
-                            'found': pattern_count
-                        })
+                # After a first hit the patterns ordered after it were never tried
+                pattern_scans.update(tried)
+                pattern_hit_pages.update(hit_counts.keys())
+                pattern_hits.update(hit_counts)
                 
-                page_pbar.close()
+                for index, count in sorted(hit_counts.items()):
+                    pattern = text_patterns[index]
+                    if first_hit is None:
+                        first_hit = {"pattern": pattern, "page": page_num + 1}
+                    pattern_counts[pattern] += count
+                    pattern_pages[pattern].add(page_num + 1)
+                    if hits_per_pattern is not None and pattern_counts[pattern] >= hits_per_pattern:
+                        pending.discard(index)
                 
-                preview_results["patterns"][pattern] = {
-                    "count": pattern_count,
-                    "pages": sorted(pattern_pages)
-                }
-                preview_results["total_instances"] += pattern_count
-                
-                # Update pattern progress bar
-                pattern_pbar.set_postfix({
-                    'found': pattern_count,
-                    'total': preview_results["total_instances"]
-                })
+                if first_hit is not None and (hits_per_pattern is None or not pending):
+                    break
             
-            pattern_pbar.close()
+            page_pbar.close()
+            
+            self._record_pattern_stats(
+                regex_set, literal_matcher, pattern_scans, pattern_hit_pages, pattern_hits
+            )
         
         finally:
+            self._close_text_index()
             doc.close()
         
-        preview_results["pages_affected"] = sorted(preview_results["pages_affected"])
-        return preview_results 
\ No newline at end of file
+        return {
+            "contains_matches": first_hit is not None,
+            "first_hit": first_hit,
+            "patterns": {
+                pattern: {"count": pattern_counts[pattern], "pages": sorted(pattern_pages[pattern])}
+                for pattern in text_patterns
+            },
+            "pages_scanned": pages_scanned,
+            "pages_total": len(selected)
+        }
+
+
+# A worker process's redactor, open document and matchers, set up once by
+# _init_scan_worker for every chunk the worker scans
+_scan_worker: Optional[Tuple['PDFRedactor', pymupdf.Document, Optional[RegexPatternSet], Optional[TextMatcher]]] = None
+
+
+def _init_scan_worker(
+    input_file: Path,
+    options: dict,
+    file_hash: Optional[bytes],
+    text_patterns: List[str],
+    case_sensitive: bool,
+    use_regex: bool,
+    whole_words_only: bool,
+    order: Optional[List[int]],
+    timed: bool
+) -> None:
+    """Open the document, text index and matchers in a worker process of a parallel scan."""
+    global _scan_worker
+    
+    redactor = PDFRedactor(input_file, show_progress=False, **options)
+    redactor._file_hash = file_hash
+    doc = redactor._open_document()
+    regex_set, literal_matcher = redactor._build_matchers(
+        text_patterns, case_sensitive, use_regex, whole_words_only, order, timed
+    )
+    redactor._open_text_index(len(doc), build=False)
+    _scan_worker = redactor, doc, regex_set, literal_matcher
+
+
+def _scan_chunk(
+    page_order: List[int],
+    with_text: bool
+) -> Tuple[List[Tuple[int, MatchStore]], ScanStats, Optional[List[float]], float]:
+    """
+    Scan one chunk of a document's pages in a worker process.
+    
+    Returns:
+        Tuple of ([(page number, matches)] in page order, the chunk's scan
+        statistics, the time spent on each regex if timed, and the wall
+        clock time the chunk was finished at)
+    """
+    redactor, doc, regex_set, literal_matcher = _scan_worker
+    patterns = regex_set.patterns if regex_set is not None else literal_matcher.patterns
+    stats = ScanStats(pages_total=len(page_order), pages_skipped={pattern: 0 for pattern in patterns})
+    
+    seconds = None
+    if regex_set is not None and regex_set.seconds is not None:
+        # Time each chunk on its own; the parent adds the chunks up
+        regex_set.seconds = seconds = [0.0] * len(patterns)
+    
+    pages = [
+        (page_num, page_matches)
+        for page_num, _, page_matches in redactor._scan_pages(
+            doc, page_order, regex_set, literal_matcher, stats, with_text
+        )
+    ]
+    return pages, stats, seconds, time.time()
@@ -0,0 +1,91 @@
+"""
+Page Sampling Module
+
+Contains the seeded page sampling and the interval estimates behind the
+sampled dry run, which extrapolates hit counts from a sample of pages.
+"""
+
+import math
+import random
+from typing import List, Sequence, Tuple
+
+# Normal quantile of the two-sided 95% intervals reported
+CONFIDENCE = 0.95
+CONFIDENCE_Z = 1.959964
+
+
+def stratified_sample(pages: Sequence[int], size: int, seed: int) -> List[int]:
+    """
+    Draw one random page from each of ``size`` equal runs of consecutive pages.
+    
+    Spreading the sample over the whole document keeps a cluster of hits,
+    e.g. an appendix, from being missed or oversampled by chance. The same
+    seed always draws the same pages.
+    
+    Returns:
+        The sampled pages in document order; all pages if ``size`` covers them
+    """
+    if size >= len(pages):
+        return list(pages)
+    
+    rng = random.Random(seed)
+    sample = []
+    for stratum in range(size):
+        start = stratum * len(pages) // size
+        end = (stratum + 1) * len(pages) // size
+        sample.append(pages[rng.randrange(start, end)])
+    return sample
+
+
+def wilson_interval(successes: int, trials: int, z: float = CONFIDENCE_Z) -> Tuple[float, float]:
+    """Wilson score interval of a proportion, which stays sensible at 0 and 1."""
+    if not trials:
+        return 0.0, 1.0
+    
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def total_interval(
+    counts: Sequence[int],
+    population: int,
+    z: float = CONFIDENCE_Z
+) -> Tuple[float, Tuple[float, float]]:
+    """
+    Estimate a population total from per-page sample counts.
+    
+    The interval uses the normal approximation with the finite population
+    correction, so it shrinks to the exact total as the sample approaches
+    the whole population. It is widened to cover the Wilson interval of the
+    pages with a hit, at the sample's hits per such page, which keeps a
+    sample without hits, or with the same hits on every page, from claiming
+    certainty. It never goes below the hits actually seen.
+    
+    Returns:
+        Tuple of (estimated total, (lower bound, upper bound))
+    """
+    n = len(counts)
+    if not n:
+        return 0.0, (0.0, math.inf)
+    
+    mean = sum(counts) / n
+    estimate = mean * population
+    if n >= population:
+        return estimate, (estimate, estimate)
+    
+    if n < 2:
+        spread = math.inf
+    else:
+        variance = sum((count - mean) ** 2 for count in counts) / (n - 1)
+        correction = (population - n) / (population - 1)
+        spread = z * population * math.sqrt(variance / n * correction)
+    
+    pages_hit = sum(1 for count in counts if count)
+    hits_per_page = sum(counts) / pages_hit if pages_hit else 1.0
+    fraction_low, fraction_high = wilson_interval(pages_hit, n, z)
+    lower = min(estimate - spread, fraction_low * population * hits_per_page)
+    upper = max(estimate + spread, fraction_high * population * hits_per_page)
+    return estimate, (max(float(sum(counts)), lower), upper)
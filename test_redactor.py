@@ -5,10 +5,51 @@ Basic tests for the PDF redaction tool.
 
 import unittest
 import tempfile
+from array import array
 from pathlib import Path
 from unittest.mock import Mock, patch
 
-from pdf_redactor import PDFRedactor, RedactionError
+import pymupdf
+
+from matchers import FuzzyMatcher, LiteralMatcher, Prefilter, RegexPatternSet, digit_template, edit_distance
+from page_text import PageText, PageTextCache, digit_clusters, merge_boxes, project_text
+from hit_matrix import HitMatrix, format_page_ranges
+from match_store import MatchRecord, MatchStore
+from pattern_stats import PatternStats
+from sampling import stratified_sample, total_interval, wilson_interval
+from pdf_redactor import PDFRedactor, RedactionError, parse_page_ranges
+from text_index import TextIndex, TextIndexWriter
+
+
+def make_textpage(*lines: str, char_width: float = 10.0) -> Mock:
+    """Build a mock TextPage with one single-span line per string."""
+    raw_lines = []
+    for row, text in enumerate(lines):
+        chars = [
+            {"c": char, "bbox": (i * char_width, row * 12.0, (i + 1) * char_width, row * 12.0 + 10)}
+            for i, char in enumerate(text)
+        ]
+        raw_lines.append({"spans": [{"chars": chars}]})
+    
+    textpage = Mock()
+    textpage.extractText.return_value = "".join(line + "\n" for line in lines)
+    textpage.extractRAWDICT.return_value = {"blocks": [{"lines": raw_lines}]}
+    return textpage
+
+
+def make_page(*lines: str, char_width: float = 10.0) -> Mock:
+    """Build a mock page with a make_textpage TextPage and a search_for over its lines."""
+    def search_for(needle, textpage=None):
+        return [
+            pymupdf.Rect(start * char_width, row * 12.0, (start + len(needle)) * char_width, row * 12.0 + 10)
+            for row, text in enumerate(lines)
+            for start in range(len(text)) if text.lower().startswith(needle.lower(), start)
+        ]
+    
+    page = Mock()
+    page.get_textpage.return_value = make_textpage(*lines, char_width=char_width)
+    page.search_for.side_effect = search_for
+    return page
 
 
 class TestPDFRedactor(unittest.TestCase):
@@ -34,6 +75,11 @@ class TestPDFRedactor(unittest.TestCase):
         self.assertEqual(redactor.input_file, self.test_file)
         self.assertTrue(str(redactor.output_file).endswith("_redacted.pdf"))
     
+    def test_negative_max_edits_rejected(self):
+        """Test that a negative edit distance is refused rather than matching nothing."""
+        with self.assertRaises(ValueError):
+            PDFRedactor(self.test_file, max_edits=-1)
+    
     def test_init_with_nonexistent_file(self):
         """Test initialization with non-existent file."""
         nonexistent_file = self.temp_dir / "nonexistent.pdf"
@@ -57,12 +103,11 @@ class TestPDFRedactor(unittest.TestCase):
         """Test find_and_redact_text with mocked PyMuPDF."""
         # Mock PyMuPDF document
         mock_doc = Mock()
-        mock_page = Mock()
+        mock_page = make_page("Some text with a test pattern in it")
         
         # Set up mock document behavior
         mock_doc.__len__ = Mock(return_value=1)
         mock_doc.__getitem__ = Mock(return_value=mock_page)
-        mock_page.search_for.return_value = [Mock()]  # One instance found
         mock_open.return_value = mock_doc
         
         redactor = PDFRedactor(self.test_file)
@@ -73,6 +118,859 @@ class TestPDFRedactor(unittest.TestCase):
         self.assertEqual(result, 1)
         mock_page.add_redact_annot.assert_called_once()
         mock_page.apply_redactions.assert_called_once()
+    
+    @patch('pdf_redactor.pymupdf.open')
+    def test_redactions_applied_once_per_page(self, mock_open):
+        """Test that hits from several patterns are applied in one step per page."""
+        mock_doc = Mock()
+        mock_page = make_page("first second first")
+        
+        mock_doc.__len__ = Mock(return_value=1)
+        mock_doc.__getitem__ = Mock(return_value=mock_page)
+        mock_open.return_value = mock_doc
+        
+        redactor = PDFRedactor(self.test_file, show_progress=False)
+        
+        with patch.object(redactor, '_save_and_optimize'):
+            result = redactor.find_and_redact_text(["first", "second", "third"])
+        
+        # Plain text and the search come from the page's single TextPage, and
+        # literals need no character geometry
+        mock_page.get_textpage.assert_called_once()
+        mock_page.get_textpage.return_value.extractRAWDICT.assert_not_called()
+        self.assertEqual(mock_page.search_for.call_count, 2)
+        self.assertEqual(result, 3)
+        self.assertEqual(mock_page.add_redact_annot.call_count, 3)
+        mock_page.apply_redactions.assert_called_once()
+    
+    @patch('pdf_redactor.pymupdf.open')
+    def test_preview_extracts_each_page_once(self, mock_open):
+        """Test that all patterns share a single text extraction per page."""
+        mock_doc = Mock()
+        mock_page = Mock()
+        
+        mock_doc.__len__ = Mock(return_value=2)
+        mock_doc.__getitem__ = Mock(return_value=mock_page)
+        mock_textpage = make_textpage("SSN 123-45-6789 ID 42")
+        mock_page.get_textpage.return_value = mock_textpage
+        mock_open.return_value = mock_doc
+        
+        redactor = PDFRedactor(self.test_file, show_progress=False)
+        preview = redactor.preview_redactions(
+            [r"\d{3}-\d{2}-\d{4}", r"ID \d+", "absent"], use_regex=True
+        )
+        
+        self.assertEqual(mock_textpage.extractRAWDICT.call_count, 2)
+        self.assertEqual(preview["total_instances"], 4)
+        self.assertEqual(preview["patterns"]["absent"]["count"], 0)
+        self.assertEqual(preview["pages_affected"], [1, 2])
+        self.assertEqual(preview["page_ranges_affected"], "1-2")
+    
+    @patch('pdf_redactor.pymupdf.open')
+    def test_repeated_patterns_are_counted_once(self, mock_open):
+        """Test that a pattern given twice is neither matched nor counted twice."""
+        mock_doc = Mock()
+        mock_page = make_page("Phone 555-0100", "Phone 555-0199")
+        
+        mock_doc.__len__ = Mock(return_value=1)
+        mock_doc.__getitem__ = Mock(return_value=mock_page)
+        mock_open.return_value = mock_doc
+        
+        redactor = PDFRedactor(self.test_file, show_progress=False)
+        for patterns, use_regex in ((["Phone", "Phone"], False), ([r"\d{3}-\d{4}"] * 2, True)):
+            preview = redactor.preview_redactions(patterns, use_regex=use_regex)
+            self.assertEqual(preview["total_instances"], 2)
+            self.assertEqual(preview["patterns"], {patterns[0]: {"count": 2, "pages": [1], "page_ranges": "1"}})
+        
+        result = redactor.triage(["Phone", "Phone"], hits_per_pattern=5)
+        self.assertEqual(result["patterns"], {"Phone": {"count": 2, "pages": [1]}})
+    
+    @patch('pdf_redactor.pymupdf.open')
+    def test_literal_options_share_one_case_rule(self, mock_open):
+        """Test that options widening literal matching never lose a hit to case."""
+        mock_doc = Mock()
+        mock_doc.__len__ = Mock(return_value=1)
+        mock_doc.__getitem__ = Mock(side_effect=lambda page_num: make_page("Signed JOHN DOE"))
+        mock_open.return_value = mock_doc
+        
+        for options in ({}, {"ignore_accents": True}, {"max_edits": 1}, {"ignore_accents": True, "max_edits": 1}):
+            redactor = PDFRedactor(self.test_file, show_progress=False, **options)
+            for case_sensitive in (True, False):
+                preview = redactor.preview_redactions(["John Doe"], case_sensitive=case_sensitive)
+                self.assertEqual(preview["total_instances"], 1, (options, case_sensitive))
+    
+    def test_casefolded_matches_map_back_to_original_characters(self):
+        """Test that literals found in the folded text are boxed on the original characters."""
+        page_text = PageText.from_textpage(make_textpage("Die Straße", "DIE"), with_geometry=True)
+        
+        self.assertEqual(project_text("Straße", casefold=True), ("strasse", array('i', [0, 1, 2, 3, 4, 4, 5, 6])))
+        self.assertEqual(project_text("DIE", casefold=True), ("die", None))
+        
+        redactor = PDFRedactor(self.test_file, show_progress=False)
+        instances = redactor._find_text_instances(
+            page_text, LiteralMatcher(["STRASSE", "die", "sse"], case_sensitive=False)
+        ).boxes_by_pattern()
+        
+        self.assertEqual(instances["STRASSE"], [[(40.0, 0.0, 100.0, 10.0)]])
+        self.assertEqual(instances["die"], [[(0.0, 0.0, 30.0, 10.0)], [(0.0, 12.0, 30.0, 22.0)]])
+        # A hit that starts inside an expanded character covers all of it
+        self.assertEqual(instances["sse"], [[(80.0, 0.0, 100.0, 10.0)]])
+    
+    def test_accent_insensitive_matches_cover_original_glyphs(self):
+        """Test that one pattern covers accented, decomposed and ligature variants."""
+        page_text = PageText.from_textpage(
+            make_textpage("José José JOSE", "ﬁnal figure"), with_geometry=True
+        )
+        redactor = PDFRedactor(self.test_file, show_progress=False, ignore_accents=True)
+        
+        literal = redactor._find_text_instances(
+            page_text, LiteralMatcher(["josé", "fi"], case_sensitive=False, ignore_accents=True)
+        ).boxes_by_pattern()
+        regex = redactor._find_regex_instances(
+            page_text, RegexPatternSet([r"\bJos[eé]\b"], ignore_accents=True)
+        ).boxes_by_pattern()
+        
+        # The combining accent after the second "Jose" is part of its box
+        self.assertEqual(literal["josé"], [
+            [(0.0, 0.0, 40.0, 10.0)], [(50.0, 0.0, 100.0, 10.0)], [(110.0, 0.0, 150.0, 10.0)]
+        ])
+        self.assertEqual(literal["fi"], [[(0.0, 12.0, 10.0, 22.0)], [(50.0, 12.0, 70.0, 22.0)]])
+        self.assertEqual(regex[r"\bJos[eé]\b"], literal["josé"][:2])
+    
+    @patch('pdf_redactor.pymupdf.open')
+    def test_prefilter_skips_pages_that_cannot_match(self, mock_open):
+        """Test that pages without a required character are never extracted in full."""
+        mock_doc = Mock()
+        pages = [Mock(), Mock()]
+        textpages = [make_textpage("no numbers here"), make_textpage("call 555-1234")]
+        for page, textpage in zip(pages, textpages):
+            page.get_textpage.return_value = textpage
+        
+        mock_doc.__len__ = Mock(return_value=2)
+        mock_doc.__getitem__ = Mock(side_effect=lambda index: pages[index])
+        mock_open.return_value = mock_doc
+        
+        redactor = PDFRedactor(self.test_file, show_progress=False)
+        preview = redactor.preview_redactions([r"\d{3}-\d{4}", r"\w+@\w+"], use_regex=True)
+        
+        self.assertEqual(preview["total_instances"], 1)
+        textpages[0].extractRAWDICT.assert_not_called()
+        textpages[1].extractRAWDICT.assert_called_once()
+        self.assertEqual(redactor.last_scan_stats.pages_extracted, 1)
+        self.assertEqual(
+            redactor.last_scan_stats.pages_skipped,
+            {r"\d{3}-\d{4}": 1, r"\w+@\w+": 2}
+        )
+    
+    def test_parse_page_ranges(self):
+        """Test page selections, including open-ended and out-of-range ones."""
+        self.assertEqual(parse_page_ranges("1-3,200-end", 250), [0, 1, 2] + list(range(199, 250)))
+        self.assertEqual(parse_page_ranges("5, 2-3, 3", 10), [1, 2, 4])
+        self.assertEqual(parse_page_ranges("8-end,9", 6), [])
+        for spec in ("0", "3-1", "a-b", "1,,2"):
+            with self.assertRaises(ValueError):
+                parse_page_ranges(spec, 10)
+    
+    @patch('pdf_redactor.pymupdf.open')
+    def test_preview_only_loads_selected_pages(self, mock_open):
+        """Test that pages outside the selection are never loaded."""
+        mock_doc = Mock()
+        pages = [make_page("John Doe") for _ in range(5)]
+        
+        mock_doc.__len__ = Mock(return_value=5)
+        mock_doc.__getitem__ = Mock(side_effect=lambda index: pages[index])
+        mock_open.return_value = mock_doc
+        
+        redactor = PDFRedactor(self.test_file, show_progress=False, pages="2,4-end")
+        preview = redactor.preview_redactions(["John Doe"])
+        
+        self.assertEqual(preview["pages_affected"], [2, 4, 5])
+        self.assertEqual(preview["page_ranges_affected"], "2, 4-5")
+        self.assertEqual(preview["hit_matrix"].pages("John Doe"), [2, 4, 5])
+        self.assertEqual(redactor.last_scan_stats.pages_total, 3)
+        self.assertEqual(sorted(call.args[0] for call in mock_doc.__getitem__.call_args_list), [1, 3, 4])
+        
+        redactor.pages = "2-1"
+        with self.assertRaises(RedactionError):
+            redactor.preview_redactions(["John Doe"])
+    
+    @patch('pdf_redactor.pymupdf.open')
+    def test_estimate_redactions_scans_only_the_sample(self, mock_open):
+        """Test that a sampled dry run loads only the sampled pages and extrapolates from them."""
+        mock_doc = Mock()
+        pages = [make_page("John Doe" if page_num % 2 else "clean") for page_num in range(10)]
+        
+        mock_doc.__len__ = Mock(return_value=10)
+        mock_doc.__getitem__ = Mock(side_effect=lambda index: pages[index])
+        mock_open.return_value = mock_doc
+        
+        redactor = PDFRedactor(self.test_file, show_progress=False)
+        estimate = redactor.estimate_redactions(["John Doe"], sample_size=4, seed=7)
+        
+        sampled = sorted(call.args[0] + 1 for call in mock_doc.__getitem__.call_args_list)
+        self.assertEqual(estimate["sample_pages"], sampled)
+        self.assertEqual(estimate["pages_sampled"], 4)
+        self.assertEqual(estimate, redactor.estimate_redactions(["John Doe"], sample_size=4, seed=7))
+        
+        info = estimate["patterns"]["John Doe"]
+        hits = sum(1 for page in sampled if page % 2 == 0)
+        self.assertEqual(info["sample_count"], hits)
+        self.assertAlmostEqual(info["estimated_count"], hits / 4 * 10)
+        low, high = info["count_interval"]
+        self.assertLessEqual(low, info["estimated_count"])
+        self.assertGreaterEqual(high, info["estimated_count"])
+        
+        # Sampling every page is an exact preview
+        info = redactor.estimate_redactions(["John Doe"], sample_fraction=1.0)["patterns"]["John Doe"]
+        self.assertEqual(info["count_interval"], (5.0, 5.0))
+        self.assertEqual(info["page_fraction_interval"], (0.5, 0.5))
+    
+    @patch('pdf_redactor.pymupdf.open')
+    def test_iter_matches_streams_records_page_by_page(self, mock_open):
+        """Test that matches are yielded per page with their text, and an early stop ends the scan."""
+        mock_doc = Mock()
+        pages = [make_page("Contact John Doe", "SSN 123-45-6789") for _ in range(3)]
+        
+        mock_doc.__len__ = Mock(return_value=3)
+        mock_doc.__getitem__ = Mock(side_effect=lambda index: pages[index])
+        mock_open.return_value = mock_doc
+        
+        redactor = PDFRedactor(self.test_file, show_progress=False)
+        matches = redactor.iter_matches([r"\d{3}-\d{2}-\d{4}", r"[Jj]ohn"], use_regex=True)
+        
+        first = next(matches)
+        self.assertEqual(first.to_dict(), {
+            "pattern": r"[Jj]ohn", "page": 1, "rects": [[80.0, 0.0, 120.0, 10.0]],
+            "text": "John"
+        })
+        self.assertEqual((next(matches).text, pages[1].get_textpage.called), ("123-45-6789", False))
+        
+        matches.close()
+        mock_doc.close.assert_called_once()
+        self.assertEqual(len(list(redactor.iter_matches(["John"]))), 3)
+    
+    @patch('pdf_redactor.pymupdf.open')
+    def test_triage_stops_at_first_hit(self, mock_open):
+        """Test that triage stops on the first page with a hit and never builds geometry."""
+        mock_doc = Mock()
+        pages = [Mock() for _ in range(4)]
+        textpages = [make_textpage(text) for text in ("clean", "SSN 123-45-6789", "123-45-6789", "clean")]
+        for page, textpage in zip(pages, textpages):
+            page.get_textpage.return_value = textpage
+        
+        mock_doc.__len__ = Mock(return_value=4)
+        mock_doc.__getitem__ = Mock(side_effect=lambda index: pages[index])
+        mock_open.return_value = mock_doc
+        
+        redactor = PDFRedactor(self.test_file, show_progress=False)
+        result = redactor.triage([r"\d{3}-\d{2}-\d{4}", "absent"], use_regex=True)
+        
+        self.assertTrue(result["contains_matches"])
+        self.assertEqual(result["first_hit"], {"pattern": r"\d{3}-\d{2}-\d{4}", "page": 2})
+        self.assertEqual(result["pages_scanned"], 2)
+        pages[2].get_textpage.assert_not_called()
+        for textpage in textpages:
+            textpage.extractRAWDICT.assert_not_called()
+        
+        # With a hit budget per pattern, the absent pattern keeps the scan going
+        result = redactor.triage([r"\d{3}-\d{2}-\d{4}", "absent"], use_regex=True, hits_per_pattern=2)
+        self.assertEqual(result["patterns"][r"\d{3}-\d{2}-\d{4}"], {"count": 2, "pages": [2, 3]})
+        self.assertEqual(result["pages_scanned"], 4)
+    
+    def test_literals_match_search_for_on_a_real_pdf(self):
+        """Test that literals find what search_for finds, across line breaks, spacing and case."""
+        doc = pymupdf.open()
+        page = doc.new_page()
+        for row, line in enumerate([
+            "Contact John Doe today", "Signed by John", "Doe and others",
+            "John  Doe spaced", "see john doe lower", "John Doers"
+        ]):
+            page.insert_text((72, 72 + 14 * row), line, fontsize=11)
+        page.insert_textbox(pymupdf.Rect(72, 200, 160, 260), "Write to John Doe at home", fontsize=11)
+        doc.save(self.test_file)
+        expected = [tuple(rect) for rect in page.search_for("John Doe")]
+        doc.close()
+        
+        index_path = self.temp_dir / "test.pdf.textindex"
+        for options in ({}, {"join_blocks": True}, {"text_index": index_path}, {"text_index": index_path}):
+            redactor = PDFRedactor(self.test_file, show_progress=False, **options)
+            for case_sensitive in (True, False):
+                rects = [
+                    rect for match in redactor.iter_matches(["John Doe"], case_sensitive=case_sensitive)
+                    for rect in match.rects
+                ]
+                self.assertEqual(len(rects), len(expected))
+                for rect, expected_rect in zip(sorted(rects), sorted(expected)):
+                    for coordinate, expected_coordinate in zip(rect, expected_rect):
+                        self.assertAlmostEqual(coordinate, expected_coordinate, places=3)
+        
+        # Every hit but the one inside "Doers" is a whole word
+        redactor = PDFRedactor(self.test_file, show_progress=False)
+        preview = redactor.preview_redactions(["John Doe"], whole_words_only=True)
+        self.assertEqual(preview["total_instances"], len(expected) - 1)
+        index_path.unlink()
+    
+    def test_anchored_regexes_match_per_block(self):
+        """Test that anchors and lookarounds see each block, not the whole page, when blocks are joined."""
+        doc = pymupdf.open()
+        page = doc.new_page()
+        page.insert_text((72, 72), "Nothing here", fontsize=11)
+        page.insert_text((72, 300), "Secret 42", fontsize=11)
+        doc.save(self.test_file)
+        doc.close()
+        
+        patterns = [r"^Secret \d+", r"here$", r"here(?! Secret)"]
+        index_path = self.temp_dir / "test.pdf.textindex"
+        for options in ({}, {"join_blocks": True}, {"join_blocks": True, "text_index": index_path}):
+            redactor = PDFRedactor(self.test_file, show_progress=False, **options)
+            preview = redactor.preview_redactions(patterns, use_regex=True)
+            self.assertEqual([preview["patterns"][pattern]["count"] for pattern in patterns], [1, 1, 1])
+            
+            result = redactor.triage(patterns[:1], use_regex=True)
+            self.assertEqual(result["first_hit"], {"pattern": patterns[0], "page": 1})
+        index_path.unlink()
+    
+    def test_failed_index_write_does_not_abort_the_run(self):
+        """Test that a text index that cannot be written is dropped with a warning."""
+        doc = pymupdf.open()
+        for _ in range(2):
+            doc.new_page().insert_text((72, 72), "Contact John Doe", fontsize=11)
+        doc.save(self.test_file)
+        doc.close()
+        
+        index_path = self.temp_dir / "test.pdf.textindex"
+        disk_full = OSError(28, "No space left on device")
+        for target in ('text_index.TextIndexWriter.add', 'text_index.os.replace'):
+            redactor = PDFRedactor(self.test_file, show_progress=False, text_index=index_path)
+            with patch(target, side_effect=disk_full), self.assertLogs('pdf_redactor', level='WARNING'):
+                preview = redactor.preview_redactions(["John Doe"])
+            self.assertEqual(preview["total_instances"], 2)
+            self.assertEqual(list(self.temp_dir.iterdir()), [self.test_file])
+    
+    def test_triage_scans_index_candidates_first(self):
+        """Test that triage scans pages the text index shows a pattern's literals on first."""
+        doc = pymupdf.open()
+        for line in ("Order 12345", "Nothing here", "Top secret"):
+            doc.new_page().insert_text((72, 72), line, fontsize=11)
+        doc.save(self.test_file)
+        doc.close()
+        
+        index_path = self.temp_dir / "test.pdf.textindex"
+        redactor = PDFRedactor(self.test_file, show_progress=False, text_index=index_path)
+        redactor.preview_redactions(["secret"])
+        
+        # Any page could hold five digits, but only the last holds "secret"
+        result = redactor.triage([r"\d{5}", "secret"], use_regex=True)
+        self.assertEqual(result["first_hit"], {"pattern": "secret", "page": 3})
+        self.assertEqual(result["pages_scanned"], 1)
+        
+        redactor = PDFRedactor(self.test_file, show_progress=False)
+        result = redactor.triage([r"\d{5}", "secret"], use_regex=True)
+        self.assertEqual(result["first_hit"], {"pattern": r"\d{5}", "page": 1})
+        index_path.unlink()
+    
+    def test_parallel_redaction_matches_serial_output(self):
+        """Test that redacting page shards in worker processes gives the serial output."""
+        doc = pymupdf.open()
+        for page_num in range(6):
+            page = doc.new_page()
+            page.insert_text((72, 72), f"Page {page_num}: John Doe, SSN 123-45-6789", fontsize=11)
+            if page_num % 2:
+                page.insert_text((72, 100), "Call John Doe at 555-0100", fontsize=11)
+        doc.save(self.test_file)
+        doc.close()
+        
+        def save(redactor):
+            # A fresh trailer /ID on every save would differ between any two runs
+            return lambda doc: doc.save(str(redactor.output_file), garbage=4, deflate=True, no_new_id=True)
+        
+        outputs = []
+        for workers in (1, 3):
+            redactor = PDFRedactor(
+                self.test_file, self.temp_dir / f"out{workers}.pdf", show_progress=False, workers=workers
+            )
+            with patch.object(redactor, '_save_and_optimize', save(redactor)):
+                count = redactor.find_and_redact_text(["John Doe", r"\d{3}-\d{2}-\d{4}"], use_regex=True)
+            
+            self.assertEqual(count, 15)
+            self.assertEqual(redactor.last_scan_stats.workers, workers)
+            self.assertEqual(redactor.last_scan_stats.pages_extracted, 6)
+            self.assertGreater(redactor.last_scan_stats.speedup, 0)
+            outputs.append(redactor.output_file.read_bytes())
+            redactor.output_file.unlink()
+        
+        self.assertEqual(outputs[0], outputs[1])
+        
+        # Matches stream back in page order from one-page chunks, one in flight per worker
+        patterns = ["John Doe", r"\d{3}-\d{2}-\d{4}"]
+        serial = [
+            match.to_dict()
+            for match in PDFRedactor(self.test_file, show_progress=False).iter_matches(patterns, use_regex=True)
+        ]
+        with patch('pdf_redactor.PARALLEL_CHUNK_PAGES', 1), patch('pdf_redactor.PARALLEL_TASKS_PER_WORKER', 1):
+            redactor = PDFRedactor(self.test_file, show_progress=False, workers=2)
+            parallel = [match.to_dict() for match in redactor.iter_matches(patterns, use_regex=True)]
+        self.assertEqual(parallel, serial)
+        self.assertEqual(redactor.last_scan_stats.workers, 2)
+    
+    @patch('pdf_redactor.pymupdf.open')
+    def test_redaction_after_preview_reuses_page_text(self, mock_open):
+        """Test that the text cache spares the redaction pass a second extraction."""
+        mock_doc = Mock()
+        mock_page = Mock()
+        
+        mock_doc.__len__ = Mock(return_value=3)
+        mock_doc.__getitem__ = Mock(return_value=mock_page)
+        mock_page.read_contents.return_value = b"BT (case 42) Tj ET"
+        mock_page.get_textpage.return_value = make_textpage("case 42")
+        mock_open.return_value = mock_doc
+        
+        redactor = PDFRedactor(self.test_file, show_progress=False, text_cache_mb=1)
+        redactor.preview_redactions([r"\d+"], use_regex=True)
+        
+        with patch.object(redactor, '_save_and_optimize'):
+            result = redactor.find_and_redact_text([r"\d+"], use_regex=True)
+        
+        # Three pages extracted by the preview, none by the redaction pass
+        self.assertEqual(result, 3)
+        self.assertEqual(mock_page.get_textpage.call_count, 3)
+        self.assertEqual(redactor.text_cache.hits, 3)
+
+
+class TestPageText(unittest.TestCase):
+    """Test cases for the character geometry index."""
+    
+    def test_bbox_uses_each_character_box(self):
+        """Test that match boxes follow proportional character widths."""
+        textpage = make_textpage("Wil iii", "x")
+        raw_chars = textpage.extractRAWDICT.return_value["blocks"][0]["lines"][0]["spans"][0]["chars"]
+        raw_chars[0]["bbox"] = (0, 0, 18, 10)
+        for i, char in enumerate(raw_chars[1:], start=1):
+            char["bbox"] = (14 + i * 4, 0, 18 + i * 4, 10)
+        
+        page_text = PageText.from_textpage(textpage, with_geometry=True)
+        
+        self.assertEqual(list(page_text.iter_units()), [(0, "Wil iii"), (8, "x")])
+        self.assertEqual(page_text.bboxes(0, 3), [(0, 0, 26, 10)])
+        self.assertEqual(page_text.bboxes(4, 7), [(30, 0, 42, 10)])
+        self.assertEqual(page_text.bboxes(8, 9), [(0, 12, 10, 22)])
+    
+    def test_matches_split_back_across_spans_and_lines(self):
+        """Test that units join spans and lines and boxes follow the spans."""
+        def span(text, x, y, height):
+            return {"chars": [
+                {"c": char, "bbox": (x + i * 10, y, x + (i + 1) * 10, y + height)}
+                for i, char in enumerate(text)
+            ]}
+        
+        textpage = Mock()
+        textpage.extractText.return_value = "John Doe\nSmith\n"
+        textpage.extractRAWDICT.return_value = {"blocks": [{"lines": [
+            {"spans": [span("John ", 0, 0, 10), span("Doe", 50, 0, 14)]},
+            {"spans": [span("Smith", 0, 20, 10)]}
+        ]}]}
+        
+        by_line = PageText.from_textpage(textpage, with_geometry=True)
+        self.assertEqual(list(by_line.iter_units()), [(0, "John Doe"), (9, "Smith")])
+        self.assertEqual(by_line.bboxes(2, 7), [(20, 0, 50, 10), (50, 0, 70, 14)])
+        
+        by_block = PageText.from_textpage(textpage, with_geometry=True, join_blocks=True)
+        self.assertEqual(list(by_block.iter_units()), [(0, "John Doe Smith")])
+        self.assertEqual(by_block.bboxes(5, 14), [(50, 0, 80, 14), (0, 20, 50, 30)])
+    
+    
+    def test_geometry_limited_to_hit_lines(self):
+        """Test that only the requested lines are indexed, with a fallback to the whole page."""
+        textpage = make_textpage("clean line", "SSN 123-45-6789", "another clean line")
+        page_text = PageText.from_textpage(textpage)
+        
+        page_text.add_geometry(textpage, {"SSN 123-45-6789"})
+        self.assertEqual(list(page_text.iter_units()), [(0, "SSN 123-45-6789")])
+        self.assertEqual(page_text.bboxes(4, 15), [(40.0, 12.0, 150.0, 22.0)])
+        self.assertTrue(page_text.covers({"SSN 123-45-6789"}))
+        self.assertFalse(page_text.covers({"clean line"}))
+        
+        # A line missing from the structured text means the whole page is indexed
+        page_text.add_geometry(textpage, {"SSN 123-45-6789", "not on the page"})
+        self.assertEqual(len(list(page_text.iter_units())), 3)
+        self.assertTrue(page_text.covers())
+    
+    def test_merge_boxes_on_the_same_line_only(self):
+        """Test that duplicate, contained and touching boxes merge per line."""
+        boxes = [
+            (0, 0, 50, 10),     # SSN hit
+            (0, 0, 50, 10),     # same SSN from a second pattern
+            (10, 1, 20, 9),     # digit run inside it
+            (50.5, 0, 80, 10),  # touching hit on the same line
+            (100, 0, 120, 10),  # separate hit on the same line
+            (30, 9, 60, 19),    # next line, slightly overlapping
+        ]
+        
+        self.assertEqual(sorted(merge_boxes(boxes, tolerance=1.0)), [
+            (0, 0, 80, 10),
+            (30, 9, 60, 19),
+            (100, 0, 120, 10),
+        ])
+
+
+class TestPageTextCache(unittest.TestCase):
+    """Test cases for the page text cache."""
+    
+    def test_lru_eviction_within_byte_budget(self):
+        """Test that the least recently used page is evicted first."""
+        pages = [PageText("x" * 1000) for _ in range(3)]
+        cache = PageTextCache(max_bytes=2 * pages[0].nbytes)
+        
+        cache.put(0, b"a", pages[0])
+        cache.put(1, b"b", pages[1])
+        self.assertIs(cache.get(0, b"a"), pages[0])
+        cache.put(2, b"c", pages[2])
+        
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(1, b"b"))
+        self.assertIs(cache.get(0, b"a"), pages[0])
+        self.assertLessEqual(cache.current_bytes, cache.max_bytes)
+    
+    def test_changed_content_is_a_miss(self):
+        """Test that a page with a different content hash is not served."""
+        cache = PageTextCache(max_bytes=1 << 20)
+        cache.put(0, b"old", PageText("old text"))
+        
+        self.assertIsNone(cache.get(0, b"new"))
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+
+
+class TestTextIndex(unittest.TestCase):
+    """Test cases for the on-disk text index."""
+    
+    def setUp(self):
+        """Write a two-page index."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.index_path = self.temp_dir / "test.pdf.textindex"
+        self.file_hash = b"\x01" * 32
+        
+        writer = TextIndexWriter(self.index_path, self.file_hash, 0, False, 2)
+        for lines in (["Contact John Doe", "SSN 123-45-6789"], ["Nothing here"]):
+            textpage = make_textpage(*lines)
+            writer.add(PageText.from_textpage(textpage, with_geometry=True))
+        self.assertTrue(writer.commit())
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_round_trip_and_bloom_filter(self):
+        """Test that pages come back with their geometry and the filter rules out absent text."""
+        index = TextIndex.open(self.index_path, self.file_hash, 0, False)
+        try:
+            page_text = index.page_text(0)
+            self.assertEqual(page_text.text, "Contact John Doe\nSSN 123-45-6789\n")
+            self.assertEqual(page_text.bboxes(8, 12), [(80.0, 0.0, 120.0, 10.0)])
+            
+            self.assertTrue(index.may_contain(0, ["john doe", "123-45"]))
+            self.assertFalse(index.may_contain(1, ["John Doe"]))
+        finally:
+            index.close()
+    
+    def test_stale_index_is_ignored(self):
+        """Test that an index of other content or other options is not used."""
+        self.assertIsNone(TextIndex.open(self.index_path, b"\x02" * 32, 0, False))
+        self.assertIsNone(TextIndex.open(self.index_path, self.file_hash, 0, True))
+    
+    def test_truncated_index_is_ignored(self):
+        """Test that an index cut short after a valid header is not used."""
+        data = self.index_path.read_bytes()
+        for size in (len(data) - 1, len(data) // 2, 80):
+            self.index_path.write_bytes(data[:size])
+            with self.assertLogs('text_index', level='WARNING'):
+                self.assertIsNone(TextIndex.open(self.index_path, self.file_hash, 0, False))
+
+
+class TestPatternStats(unittest.TestCase):
+    """Test cases for the per-pattern statistics kept across runs."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.stats_path = self.temp_dir / "pattern_stats.json"
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    
+    def test_records_persist_and_reset(self):
+        """Test that records add up across runs, survive a reload and can be reset."""
+        stats = PatternStats.load(self.stats_path)
+        stats.record("regex", "a+", pages=10, pages_hit=2, hits=5, seconds=0.5)
+        stats.record("regex", "a+", pages=10, pages_hit=2, hits=1, seconds=0.5)
+        stats.save()
+        
+        record = PatternStats.load(self.stats_path).get("regex", "a+")
+        self.assertEqual((record.pages, record.pages_hit, record.hits), (20, 4, 6))
+        self.assertAlmostEqual(record.hit_rate, 0.2)
+        self.assertAlmostEqual(record.seconds_per_page, 0.05)
+        self.assertIsNone(PatternStats.load(self.stats_path).get("literal", "a+"))
+        
+        stats.reset()
+        self.assertFalse(self.stats_path.exists())
+        self.assertEqual(PatternStats.load(self.stats_path).records, {})
+    
+    def test_order_tries_cheapest_way_to_a_hit_first(self):
+        """Test that patterns are ordered by expected cost to a hit, unknown before never-hit."""
+        stats = PatternStats(self.stats_path)
+        stats.record("regex", "slow", pages=10, pages_hit=5, hits=5, seconds=1.0)
+        stats.record("regex", "rare", pages=10, pages_hit=1, hits=1, seconds=0.1)
+        stats.record("regex", "never", pages=10, pages_hit=0, hits=0, seconds=0.01)
+        stats.record("regex", "fast", pages=10, pages_hit=5, hits=5, seconds=0.1)
+        
+        patterns = ["never", "new", "slow", "rare", "fast"]
+        self.assertEqual(stats.order("regex", patterns), [4, 3, 2, 1, 0])
+        
+        pattern_set = RegexPatternSet(patterns, order=stats.order("regex", patterns), timed=True)
+        self.assertEqual(next(pattern_set.finditer("slow rare fast")), (4, 10, 14))
+        self.assertEqual(sorted(pattern_set.finditer("slow rare fast")), [(2, 0, 4), (3, 5, 9), (4, 10, 14)])
+        self.assertEqual(len(pattern_set.seconds), len(patterns))
+    
+    @patch('pdf_redactor.pymupdf.open')
+    def test_triage_records_every_pattern_tried(self, mock_open):
+        """Test that a first-hit triage records a page for the patterns run before the hit, and only those."""
+        input_file = self.temp_dir / "test.pdf"
+        input_file.write_text("dummy content")
+        mock_doc = Mock()
+        mock_doc.__len__ = Mock(return_value=1)
+        mock_doc.__getitem__ = Mock(return_value=make_page("order 12345"))
+        mock_open.return_value = mock_doc
+        
+        redactor = PDFRedactor(input_file, show_progress=False, pattern_stats=self.stats_path)
+        result = redactor.triage([r"\d{6}", r"\d{5}", r"\d{4}r", r"x\d"], use_regex=True)
+        self.assertEqual(result["first_hit"], {"pattern": r"\d{5}", "page": 1})
+        
+        # The first ran without a hit, the fourth was ruled out by the
+        # prefilter, and the third, ordered after the hit, never ran
+        stats = PatternStats.load(self.stats_path)
+        self.assertEqual(
+            [(stats.get("regex", pattern).pages, stats.get("regex", pattern).pages_hit)
+             for pattern in (r"\d{6}", r"\d{5}", r"\d{4}r", r"x\d")],
+            [(1, 0), (1, 1), (0, 0), (1, 0)]
+        )
+
+
+class TestHitMatrix(unittest.TestCase):
+    """Test cases for the bit-packed pattern-by-page hit matrix."""
+    
+    def test_rows_counts_and_ranges(self):
+        """Test that hits are counted per pattern and pages come back as lists and ranges."""
+        matrix = HitMatrix(["a", "b", "a"], 100)
+        self.assertEqual(matrix.patterns, ["a", "b"])
+        
+        for page_num in list(range(0, 40)) + list(range(89, 100)):
+            matrix.add("a", page_num, 2)
+        matrix.add("b", 40)
+        matrix.add("b", 59)
+        
+        self.assertEqual(matrix.count("a"), 102)
+        self.assertEqual(matrix.total_instances, 104)
+        self.assertEqual(matrix.pages_hit("a"), 51)
+        self.assertEqual(matrix.page_ranges("a"), "1-40, 90-100")
+        self.assertEqual(matrix.pages("b"), [41, 60])
+        self.assertEqual(matrix.page_ranges(), "1-41, 60, 90-100")
+        self.assertEqual(matrix.pages_hit(), 53)
+        self.assertEqual(format_page_ranges([]), "")
+
+
+class TestMatchStore(unittest.TestCase):
+    """Test cases for the column-oriented match store."""
+    
+    def test_columns_records_and_aggregates(self):
+        """Test that matches round-trip through the columns and can be filtered and counted."""
+        store = MatchStore(["a", "b", "a"], keep_text=True)
+        store.add(0, 0, [(1.0, 2.0, 3.0, 4.0)], "aaa")
+        store.add(1, 4, [(5.0, 6.0, 7.0, 8.0), (0.0, 16.0, 4.0, 20.0)], "bb\nbb")
+        store.add(2, 4, [(9.0, 6.0, 10.0, 8.0)], "a")
+        
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store[1], MatchRecord("b", 5, [(5.0, 6.0, 7.0, 8.0), (0.0, 16.0, 4.0, 20.0)], "bb\nbb"))
+        self.assertEqual(store[-1].rects, [(9.0, 6.0, 10.0, 8.0)])
+        self.assertEqual(len(store.all_rects()), 4)
+        
+        self.assertEqual(list(store.counts()), [1, 1, 1])
+        self.assertEqual(store.count_by_pattern(), {"a": 2, "b": 1})
+        self.assertEqual([record.text for record in store.filter(page_nums=[4])], ["bb\nbb", "a"])
+        self.assertEqual(len(store.filter(pattern_id=0, page_nums=[4])), 0)
+        
+        merged = MatchStore(store.patterns, keep_text=True)
+        merged.extend(store)
+        merged.extend(store.filter(pattern_id=1))
+        self.assertEqual(merged[3], store[1])
+        self.assertEqual(merged.nbytes, 4 * (2 * 4 + 5) + 4 * 4 * 6)
+        
+        # Boxes come out of the 32-bit columns without the float noise
+        store.add(0, 1, [(408.175, 72.1, 500.0, 84.3)])
+        self.assertEqual(store[-1].to_dict()["rects"], [[408.175, 72.1, 500.0, 84.3]])
+        
+        with self.assertRaises(AttributeError):
+            store[0].score = 1.0
+
+
+class TestSampling(unittest.TestCase):
+    """Test cases for page sampling and the sampled estimates."""
+    
+    def test_stratified_sample_is_seeded_and_spread(self):
+        """Test that the sample is reproducible and takes one page per stratum."""
+        pages = list(range(100))
+        sample = stratified_sample(pages, 10, seed=3)
+        self.assertEqual(sample, stratified_sample(pages, 10, seed=3))
+        self.assertEqual([page // 10 for page in sample], list(range(10)))
+        self.assertEqual(stratified_sample(pages[:5], 10, seed=3), pages[:5])
+    
+    def test_intervals(self):
+        """Test the Wilson interval and the extrapolated total."""
+        low, high = wilson_interval(0, 10)
+        self.assertEqual(low, 0.0)
+        self.assertAlmostEqual(high, 0.2775, places=4)
+        
+        estimate, (low, high) = total_interval([0, 2, 0, 2], 100)
+        self.assertEqual(estimate, 100.0)
+        self.assertTrue(4 <= low < estimate < high)
+        
+        # A sample without hits still allows for some
+        estimate, (low, high) = total_interval([0] * 10, 100)
+        self.assertEqual((estimate, low), (0.0, 0.0))
+        self.assertGreater(high, 0)
+
+
+class TestRegexPatternSet(unittest.TestCase):
+    """Test cases for the combined regex matcher."""
+    
+    def test_overlapping_matches_are_attributed(self):
+        """Test that overlapping hits of different patterns are all reported."""
+        pattern_set = RegexPatternSet([r"\d{3}-\d{2}-\d{4}", r"\d+", "absent"])
+        hits = sorted(pattern_set.finditer("SSN 123-45-6789"))
+        
+        self.assertEqual(hits, [(0, 4, 15), (1, 4, 7), (1, 8, 10), (1, 11, 15)])
+    
+    def test_clean_text_and_first_hit(self):
+        """Test the single-scan check used for text without matches."""
+        pattern_set = RegexPatternSet(["foo", "ba+r"], case_sensitive=False)
+        
+        self.assertIsNone(pattern_set.first_hit("nothing here"))
+        self.assertEqual(pattern_set.first_hit("x BAAR foo"), (1, 2))
+        self.assertEqual(list(pattern_set.finditer("nothing here")), [])
+    
+    def test_invalid_and_backreference_patterns(self):
+        """Test that invalid patterns are skipped and back-references still work."""
+        pattern_set = RegexPatternSet(["(unclosed", r"(\w)\1", "b"])
+        
+        self.assertEqual(len(pattern_set), 2)
+        self.assertEqual(sorted(pattern_set.finditer("abba")), [(1, 1, 3), (2, 1, 2), (2, 2, 3)])
+
+
+class TestPrefilter(unittest.TestCase):
+    """Test cases for the required-literal and character class prefilter."""
+    
+    def test_requirements_rule_out_patterns(self):
+        """Test literals, classes, alternations and case folding in derived requirements."""
+        prefilter = Prefilter([
+            r"\b[\w.]+@[\w.]+\.[a-z]{2,}\b",
+            r"\d{3}-\d{4}",
+            r"(?i)id \d+|no\.\s?\d+",
+            r"[^x]*",
+            "(unclosed"
+        ])
+        
+        self.assertEqual(prefilter.candidates("nothing"), {3, 4})
+        self.assertEqual(prefilter.candidates("mail a@b.io"), {0, 3, 4})
+        self.assertEqual(prefilter.candidates("555-1234"), {1, 2, 3, 4})
+        self.assertEqual(prefilter.requirements[2], (frozenset(), frozenset({r"\d"}), True))
+
+
+class TestDigitProjection(unittest.TestCase):
+    """Test cases for matching numeric patterns by their digits alone."""
+    
+    def test_numeric_patterns_match_any_separators(self):
+        """Test that a phone pattern covers other formats but not part of a longer number."""
+        text = "call (555) 123 4567 or 555.123.4567, not 15551234567; SSN 123-45-6789"
+        pattern_set = RegexPatternSet(
+            [r"\b\d{3}[-.]?\d{3}[-.]?\d{4}\b", r"\b\d{9}\b", "SSN"], digit_projection=True
+        )
+        
+        self.assertEqual(sorted(pattern_set.finditer(text)), [
+            (0, 6, 19), (0, 23, 35), (1, 58, 69), (2, 54, 57)
+        ])
+        self.assertIsNone(digit_template("SSN \\d+"))
+        
+        # Word boundaries are checked around the digits; other anchors keep
+        # the pattern a regex
+        self.assertEqual(list(pattern_set.finditer("ID5551234567x")), [])
+        self.assertIsNone(digit_template(r"^\d{3}-\d{4}$"))
+        anchored_set = RegexPatternSet([r"^\d{3}-\d{4}$"], digit_projection=True)
+        self.assertEqual(list(anchored_set.finditer("call 555-1234 now")), [])
+        self.assertEqual(list(anchored_set.finditer("555-1234")), [(0, 0, 8)])
+        whole_set = RegexPatternSet([r"\d{3}-\d{4}"], whole_words_only=True, digit_projection=True)
+        self.assertEqual(list(whole_set.finditer("x555-1234 or 555 1234")), [(0, 13, 21)])
+        self.assertEqual(digit_clusters("(555) 123-4567 x")[0][2], [0, 3, 6, 10])
+
+
+class TestFuzzyMatcher(unittest.TestCase):
+    """Test cases for matching literals within an edit distance."""
+    
+    def test_bit_parallel_edit_distance(self):
+        """Test the bit-parallel distance against known values."""
+        masks = {"k": 1, "i": 2, "t": 4 | 8, "e": 16, "n": 32}
+        
+        self.assertEqual(edit_distance(masks, 6, "kitten"), 0)
+        self.assertEqual(edit_distance(masks, 6, "sitting"), 3)
+        self.assertEqual(edit_distance(masks, 6, ""), 6)
+    
+    def test_finds_garbled_names_as_whole_words(self):
+        """Test substitutions, merged words and the edit budget of short literals."""
+        matcher = FuzzyMatcher(["John Doe", "Smith", "Jon"], max_edits=2, case_sensitive=False)
+        text = "Contact Jonh Doe, JohnDoe and Mr Smlth; Jan Jon"
+        
+        self.assertEqual(
+            [(index, text[start:end]) for index, start, end in matcher.finditer(text)],
+            [(0, "Jonh Doe"), (0, "JohnDoe"), (1, "Smlth"), (2, "Jon")]
+        )
+    
+    def test_only_literals_sharing_qgrams_are_verified(self):
+        """Test that unrelated literals are never compared, while one-letter literals still match."""
+        names = [f"Name{number:04d} Person" for number in range(1000)]
+        matcher = FuzzyMatcher(names + ["Jane Roe", "Q"], max_edits=2)
+        
+        with patch('matchers.edit_distance', wraps=edit_distance) as distance:
+            hits = list(matcher.finditer("Call Jnae Roe or Q today"))
+        
+        self.assertEqual(sorted(hits), [(1000, 5, 13), (1001, 17, 18)])
+        self.assertLess(distance.call_count, 10)
+
+
+class TestLiteralMatcher(unittest.TestCase):
+    """Test cases for the Aho-Corasick literal matcher."""
+    
+    def test_finds_all_literals_in_one_pass(self):
+        """Test overlapping literals, repeated hits and case folding."""
+        matcher = LiteralMatcher(["he", "she", "hers", "xyz"], case_sensitive=False)
+        hits = sorted(matcher.finditer("uSHErs and he"))
+        
+        self.assertEqual(hits, [(0, 2, 4), (0, 11, 13), (1, 1, 4), (2, 2, 6)])
+        self.assertEqual(matcher.present("ushers"), {0, 1, 2})
+    
+    def test_repeated_literal_does_not_overlap(self):
+        """Test that occurrences of one literal are reported like str.find would."""
+        matcher = LiteralMatcher(["aa", ""])
+        
+        self.assertEqual(list(matcher.finditer("aaaaa")), [(0, 0, 2), (0, 2, 4)])
+    
+    def test_whole_words_checked_in_the_same_pass(self):
+        """Test that whole-word mode rejects hits inside words, like a \\b regex would."""
+        matcher = LiteralMatcher(["John", "-x", "AA"], whole_words_only=True)
+        
+        self.assertEqual(sorted(matcher.finditer("John Johnny xJohn John.")), [(0, 0, 4), (0, 18, 22)])
+        self.assertEqual(list(matcher.finditer("a -x b-x")), [(1, 6, 8)])
+        # A rejected hit does not hide the next occurrence
+        self.assertEqual(list(matcher.finditer("AAA AA")), [(2, 4, 6)])
 
 
 class TestMainFunction(unittest.TestCase):
@@ -84,6 +982,39 @@ class TestMainFunction(unittest.TestCase):
         from main import parse_arguments
         with self.assertRaises(SystemExit):
             parse_arguments()
+    
+    @patch('sys.stderr')
+    def test_hits_per_pattern_must_be_positive(self, _stderr):
+        """Test that triage is not asked to stop after no hits at all."""
+        from main import parse_arguments
+        for value in ('0', '-2'):
+            argv = ['main.py', '--triage', '--hits-per-pattern', value, 'input.pdf', 'rare']
+            with patch('sys.argv', argv), self.assertRaises(SystemExit):
+                parse_arguments()
+    
+    @patch('main.PDFRedactor')
+    def test_escalate_runs_full_dry_run_without_sample_hits(self, mock_redactor_class):
+        """Test that --escalate follows a sample with no hits with the full dry run too."""
+        from main import main
+        redactor = mock_redactor_class.return_value
+        redactor.estimate_redactions.return_value = {
+            "pages_sampled": 1, "pages_total": 100, "seed": 0, "confidence": 0.95,
+            "patterns": {"rare": {
+                "sample_count": 0, "estimated_count": 0.0, "count_interval": (0.0, 300.0),
+                "page_fraction": 0.0, "page_fraction_interval": (0.0, 0.79)
+            }}
+        }
+        redactor.preview_redactions.return_value = {
+            "patterns": {"rare": {"count": 1, "pages": [57], "page_ranges": "57"}},
+            "total_instances": 1,
+            "pages_affected": [57],
+            "page_ranges_affected": "57"
+        }
+        
+        argv = ['main.py', '--no-progress', '--sample', '1', '--escalate', 'input.pdf', 'rare']
+        with patch('sys.argv', argv), patch('main.setup_logging'):
+            self.assertEqual(main(), 0)
+        redactor.preview_redactions.assert_called_once()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,324 @@
+"""
+Text Index Module
+
+Contains the on-disk index that stores the extracted text and character
+geometry of a document, so repeated runs over the same PDF can skip MuPDF's
+text extraction entirely.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Iterable, List, Optional
+
+from page_text import PageText
+
+TEXT_INDEX_SUFFIX = ".textindex"
+INDEX_MAGIC = b"PDFRTIDX"
+INDEX_VERSION = 1
+
+# magic, version, SHA-256 of the input, TextPage flags, join_blocks, page count,
+# offset of the page table
+HEADER = struct.Struct("<8sH32sIIIQ")
+# Offset of each page record
+PAGE_ENTRY = struct.Struct("<Q")
+# Bytes of bloom filter, UTF-8 text and UTF-8 characters, then the number of
+# units, spans and characters
+RECORD_HEADER = struct.Struct("<IIIIII")
+
+HASH_CHUNK_SIZE = 1024 * 1024
+BLOOM_HASHES = 4
+BLOOM_BITS_PER_TRIGRAM = 10
+MIN_BLOOM_BYTES = 64
+
+# All arrays are stored little-endian
+SWAP_BYTES = sys.byteorder != "little"
+
+
+def file_sha256(path: Path) -> bytes:
+    """Hash a file's content in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def default_index_path(input_file: Path) -> Path:
+    """Path of the text index stored next to an input file."""
+    return input_file.with_name(input_file.name + TEXT_INDEX_SUFFIX)
+
+
+def _trigrams(text: str) -> Iterable[bytes]:
+    """Yield the encoded, case-folded trigrams of a text."""
+    folded = text.casefold()
+    for start in range(len(folded) - 2):
+        yield folded[start:start + 3].encode("utf-8")
+
+
+def _bloom_positions(trigram: bytes, size_bits: int) -> List[int]:
+    """Bit positions of a trigram, by double hashing two stable checksums."""
+    first = zlib.crc32(trigram)
+    second = zlib.adler32(trigram) | 1
+    return [(first + i * second) % size_bits for i in range(BLOOM_HASHES)]
+
+
+def build_bloom(text: str) -> bytes:
+    """Build a bloom filter of the trigrams of a page's text, with lines joined by spaces."""
+    trigrams = set(_trigrams(text.replace("\n", " ")))
+    size = max(MIN_BLOOM_BYTES, (len(trigrams) * BLOOM_BITS_PER_TRIGRAM + 7) // 8)
+    bits = bytearray(size)
+    for trigram in trigrams:
+        for position in _bloom_positions(trigram, size * 8):
+            bits[position >> 3] |= 1 << (position & 7)
+    return bytes(bits)
+
+
+def bloom_may_contain(bloom: bytes, literal: str) -> bool:
+    """Check whether a page's bloom filter allows a literal to occur in its text."""
+    size_bits = len(bloom) * 8
+    for trigram in _trigrams(literal):
+        for position in _bloom_positions(trigram, size_bits):
+            if not bloom[position >> 3] & (1 << (position & 7)):
+                return False
+    return True
+
+
+def _column_bytes(column: array) -> bytes:
+    """Encode an array column for the index."""
+    if SWAP_BYTES:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _read_column(typecode: str, data: memoryview) -> array:
+    """Decode an array column from the index."""
+    column = array(typecode)
+    column.frombytes(data)
+    if SWAP_BYTES:
+        column.byteswap()
+    return column
+
+
+class TextIndex:
+    """
+    Read-only view of a document's text index, memory-mapped from disk.
+    
+    Each page record holds a bloom filter of the page's trigrams, its plain
+    text and its complete character index. Only the records of the pages a
+    run actually touches are read, and a page whose bloom filter rules out
+    every pattern is skipped without decoding its text.
+    """
+    
+    def __init__(
+        self,
+        path: Path,
+        page_count: int,
+        join_blocks: bool,
+        file,
+        mapped: mmap.mmap,
+        offsets: List[int]
+    ):
+        self.path = path
+        self.page_count = page_count
+        self.join_blocks = join_blocks
+        self._file = file
+        self._map = mapped
+        self._offsets = offsets
+    
+    @classmethod
+    def open(cls, path: Path, file_hash: bytes, textpage_flags: int, join_blocks: bool) -> Optional['TextIndex']:
+        """
+        Open an index if it exists and matches the input file and extraction options.
+        
+        Returns:
+            The index, or None if it is missing, stale or unreadable
+        """
+        logger = logging.getLogger(__name__)
+        if not path.exists():
+            return None
+        
+        try:
+            f = open(path, "rb")
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot read text index {path}: {e}")
+            return None
+        
+        try:
+            magic, version, index_hash, flags, index_join_blocks, page_count, table_offset = HEADER.unpack_from(
+                mapped, 0
+            )
+        except struct.error:
+            magic = None
+        
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            logger.warning(f"Ignoring text index in an unknown format: {path}")
+        elif index_hash != file_hash:
+            logger.info(f"Text index is stale, the input file has changed: {path}")
+        elif flags != textpage_flags or bool(index_join_blocks) != join_blocks:
+            logger.info(f"Text index was built with different extraction options: {path}")
+        else:
+            offsets = cls._page_offsets(mapped, table_offset, page_count)
+            if offsets is not None:
+                return cls(path, page_count, join_blocks, f, mapped, offsets)
+            logger.warning(f"Ignoring truncated text index: {path}")
+        
+        mapped.close()
+        f.close()
+        return None
+    
+    @staticmethod
+    def _page_offsets(mapped: mmap.mmap, table_offset: int, page_count: int) -> Optional[List[int]]:
+        """
+        Read the page table, checking that it and every record lie within the file.
+        
+        Returns:
+            The offset of each page record, or None if the file is cut short
+        """
+        size = len(mapped)
+        if table_offset + page_count * PAGE_ENTRY.size > size:
+            return None
+        
+        offsets = []
+        for page_num in range(page_count):
+            offset = PAGE_ENTRY.unpack_from(mapped, table_offset + page_num * PAGE_ENTRY.size)[0]
+            if offset + RECORD_HEADER.size > size:
+                return None
+            
+            bloom_size, text_size, chars_size, units, spans, chars = RECORD_HEADER.unpack_from(mapped, offset)
+            columns_size = 4 * (2 * units + 2 * spans + 4 * chars)
+            if offset + RECORD_HEADER.size + bloom_size + text_size + chars_size + columns_size > size:
+                return None
+            offsets.append(offset)
+        
+        return offsets
+    
+    def close(self) -> None:
+        """Unmap and close the index file."""
+        self._map.close()
+        self._file.close()
+    
+    def _record(self, page_num: int):
+        """Return the record header fields and the offset of the data following it."""
+        offset = self._offsets[page_num]
+        return RECORD_HEADER.unpack_from(self._map, offset), offset + RECORD_HEADER.size
+    
+    def may_contain(self, page_num: int, literals: Iterable[str]) -> bool:
+        """Check a page's bloom filter for literals that must all occur on it."""
+        (bloom_size, *_), offset = self._record(page_num)
+        bloom = self._map[offset:offset + bloom_size]
+        return all(bloom_may_contain(bloom, literal) for literal in literals)
+    
+    def page_text(self, page_num: int) -> PageText:
+        """Load a page's plain text and complete character index."""
+        (bloom_size, text_size, chars_size, units, spans, chars), offset = self._record(page_num)
+        view = memoryview(self._map)
+        
+        try:
+            offset += bloom_size
+            page_text = PageText(
+                str(view[offset:offset + text_size], "utf-8"), join_blocks=self.join_blocks
+            )
+            offset += text_size
+            page_text.chars = str(view[offset:offset + chars_size], "utf-8")
+            offset += chars_size
+            
+            for name, typecode, count in (
+                ("unit_starts", "i", units), ("unit_ends", "i", units),
+                ("span_starts", "i", spans), ("span_ends", "i", spans),
+                ("x0", "f", chars), ("y0", "f", chars), ("x1", "f", chars), ("y1", "f", chars)
+            ):
+                size = count * 4
+                setattr(page_text, name, _read_column(typecode, view[offset:offset + size]))
+                offset += size
+        finally:
+            view.release()
+        
+        return page_text
+
+
+class TextIndexWriter:
+    """
+    Writes a document's text index page by page as the document is scanned.
+    
+    Records are streamed to a temporary file next to the index, which only
+    replaces the index once every page has been written.
+    """
+    
+    def __init__(self, path: Path, file_hash: bytes, textpage_flags: int, join_blocks: bool, page_count: int):
+        self.path = path
+        self.file_hash = file_hash
+        self.textpage_flags = textpage_flags
+        self.join_blocks = join_blocks
+        self.page_count = page_count
+        
+        self._temp_path = path.with_name(path.name + ".tmp")
+        self._file: Optional[BinaryIO] = open(self._temp_path, "wb")
+        self._file.write(b"\0" * HEADER.size)
+        self._offsets: List[int] = []
+    
+    def add(self, page_text: PageText) -> None:
+        """Append the next page, which must have its complete character index."""
+        bloom = build_bloom(page_text.text)
+        text = page_text.text.encode("utf-8")
+        chars = page_text.chars.encode("utf-8")
+        
+        self._offsets.append(self._file.tell())
+        self._file.write(RECORD_HEADER.pack(
+            len(bloom), len(text), len(chars),
+            len(page_text.unit_starts), len(page_text.span_starts), len(page_text.x0)
+        ))
+        self._file.write(bloom)
+        self._file.write(text)
+        self._file.write(chars)
+        for column in (
+            page_text.unit_starts, page_text.unit_ends, page_text.span_starts, page_text.span_ends,
+            page_text.x0, page_text.y0, page_text.x1, page_text.y1
+        ):
+            self._file.write(_column_bytes(column))
+    
+    def commit(self) -> bool:
+        """
+        Finish the index if every page was added, replacing any previous index.
+        
+        Returns:
+            True if the index was written
+        """
+        if len(self._offsets) != self.page_count:
+            self.abort()
+            return False
+        
+        table_offset = self._file.tell()
+        for offset in self._offsets:
+            self._file.write(PAGE_ENTRY.pack(offset))
+        
+        self._file.seek(0)
+        self._file.write(HEADER.pack(
+            INDEX_MAGIC, INDEX_VERSION, self.file_hash, self.textpage_flags,
+            int(self.join_blocks), self.page_count, table_offset
+        ))
+        self._file.close()
+        self._file = None
+        
+        os.replace(self._temp_path, self.path)
+        return True
+    
+    def abort(self) -> None:
+        """Discard a partially written index."""
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                # Flushing what a failed write left behind can fail again
+                pass
+            self._file = None
+        if self._temp_path.exists():
+            os.remove(self._temp_path)